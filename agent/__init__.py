@@ -1,19 +1,44 @@
 """
 Spotify Music Agent Package
 Clean public API for the music recommendation agent following financial agent patterns
+
+Exports are resolved on first access (PEP 562), so `import agent` or
+`import agent.client` does not pull in LangChain, the LLM client or Tavily.
 """
+import importlib
 
-from .music_agent import SpotifyMusicAgent, run_spotify_agent, run_spotify_agent_with_project_routing
-from .spotify_tools import SPOTIFY_TOOLS
-from .client import WorkingSpotifyClient
-from . import config
+_EXPORTS = {
+    "SpotifyMusicAgent": ".music_agent",
+    "run_spotify_agent": ".music_agent",
+    "run_spotify_agent_with_project_routing": ".music_agent",
+    "AgentPool": ".pool",
+    "get_agent_pool": ".pool",
+    "SPOTIFY_TOOLS": ".spotify_tools",
+    "WorkingSpotifyClient": ".client",
+    "AsyncSpotifyClient": ".async_client",
+}
 
 __all__ = [
     "SpotifyMusicAgent",
     "run_spotify_agent",
     "run_spotify_agent_with_project_routing",
+    "AgentPool",
+    "get_agent_pool",
     "SPOTIFY_TOOLS",
     "WorkingSpotifyClient",
+    "AsyncSpotifyClient",
     "config",
 ]
 
+def __getattr__(name: str):
+    if name == "config":
+        return importlib.import_module(".config", __name__)
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        if name != "SPOTIFY_TOOLS":  # The tool list is rebuilt on each access
+            globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
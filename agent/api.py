@@ -2,10 +2,12 @@ from typing import Dict, Any, Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import asyncio
 import json
-from langsmith import Client
 
-from .music_agent import SpotifyMusicAgent
+from .pool import AgentPool, get_agent_pool
+from .spotify_tools import get_spotify_client, get_async_spotify_stats, get_tool_cache_stats, close_async_spotify_client
+from .web_search import get_web_search_stats
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -23,9 +25,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global agent instance and LangSmith client
-agent = None
-langsmith_client = Client()
+# Warm agent pool (filled on startup) and LangSmith client (created on first feedback)
+agent_pool: Optional[AgentPool] = None
+_langsmith_client = None
+
+def get_langsmith_client():
+    """Get or create the LangSmith client used for feedback."""
+    global _langsmith_client
+    if _langsmith_client is None:
+        from langsmith import Client
+        _langsmith_client = Client()
+    return _langsmith_client
 
 # Request/Response models
 class MusicQueryRequest(BaseModel):
@@ -51,23 +61,34 @@ class MusicQueryResponse(BaseModel):
     query: str
     thread_id: Optional[str] = None
     trace_id: Optional[str] = None
+    prompt_tokens: Optional[Dict[str, Any]] = None
     success: bool = True
     error: Optional[str] = None
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize agent on startup"""
-    global agent
+    """Build the agent pool on startup"""
+    global agent_pool
     print("Initializing Spotify Music Concierge Agent...")
 
     try:
-        agent = SpotifyMusicAgent()
-        print("Agent initialized successfully!")
+        # Build the shared sync client (token fetch, SQLite caches) off the event loop,
+        # so the first /chat doesn't do it on the loop via get_async_spotify_client()
+        await asyncio.to_thread(get_spotify_client)
+        pool = get_agent_pool()
+        seconds = pool.warm_up()
+        agent_pool = pool
+        print(f"Agent pool ready: {pool.size} agents built in {seconds:.2f}s")
         print("Ready to serve music recommendations")
     except Exception as e:
         print(f"Failed to initialize agent: {e}")
         raise e
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the async Spotify connection pool opened by /chat"""
+    await close_async_spotify_client()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -88,19 +109,43 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "agent_ready": agent is not None,
+        "agent_ready": agent_pool is not None,
         "version": "2.1.0"
     }
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Spotify client metrics: connection pool, caches, tokens, rate limiting, coalescing and resilience, plus tool and web search caches and the agent pool
+
+    /chat runs on the async client and /evaluate on the sync one. They share
+    caches, tokens, rate limiting and resilience; each has its own
+    connection pool and coalescing stats.
+    """
+    spotify = get_spotify_client()
+    return {
+        "async_client": get_async_spotify_stats(),
+        "pool": spotify.get_pool_stats(),
+        "cache": spotify.get_cache_stats(),
+        "token": spotify.get_token_stats(),
+        "rate_limit": spotify.get_rate_limit_stats(),
+        "coalescing": spotify.get_coalescing_stats(),
+        "resilience": spotify.get_resilience_stats(),
+        "tools": get_tool_cache_stats(),
+        "web_search": get_web_search_stats(),
+        "agent_pool": agent_pool.stats() if agent_pool is not None else None
+    }
+
 @app.post("/chat", response_model=MusicQueryResponse)
 async def chat_music(request: MusicQueryRequest):
     """Main music chat endpoint"""
-    if agent is None:
+    if agent_pool is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
 
     try:
-        # Get response from agent
-        result = agent.analyze_query(request.query, request.thread_id)
+        # Get response from a pooled agent
+        async with agent_pool.aagent() as agent:
+            result = await agent.aanalyze_query(request.query, request.thread_id)
 
         return MusicQueryResponse(
             response=result["response"],
@@ -113,6 +158,7 @@ async def chat_music(request: MusicQueryRequest):
             query=result["query"],
             thread_id=result["thread_id"],
             trace_id=result.get("trace_id"),
+            prompt_tokens=result.get("prompt_tokens"),
             success=not result.get("error", False),
             error=result.get("error")
         )
@@ -127,9 +173,9 @@ async def chat_music(request: MusicQueryRequest):
         )
 
 @app.post("/evaluate")
-async def evaluate_agent(inputs: Dict[str, str]):
-    """Evaluation endpoint for LangSmith"""
-    if agent is None:
+def evaluate_agent(inputs: Dict[str, str]):
+    """Evaluation endpoint for LangSmith (sync, so FastAPI runs it in a worker thread: the agent checkout blocks)"""
+    if agent_pool is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
 
     from .music_agent import run_spotify_agent_with_project_routing
@@ -145,7 +191,7 @@ async def submit_feedback(request: FeedbackRequest):
     """Submit user feedback for a response"""
     try:
         # Log feedback to LangSmith
-        langsmith_client.create_feedback(
+        get_langsmith_client().create_feedback(
             key="user_feedback",
             score=request.feedback,
             trace_id=request.trace_id,
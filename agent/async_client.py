@@ -0,0 +1,505 @@
+import asyncio
+import base64
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from datetime import datetime
+import httpx
+from .auth import SpotifyTokenManager
+from .coalesce import AsyncSingleFlight
+from .cache import ArtistIdCache, ResponseCache, CachedResponse, MISSING
+from .catalog import TrackCatalog
+from .client import (
+    format_track, format_artist, format_playlist, chunked, split_api_url, shuffle_tracks,
+    MAX_TRACK_IDS_PER_REQUEST, MAX_ARTIST_IDS_PER_REQUEST, PLAYLIST_PAGE_SIZE
+)
+from .concurrency import afan_out
+from .track import Track
+from .rate_limit import RequestScheduler, get_default_scheduler, parse_retry_after, request_priority, BATCH
+from .resilience import ResilientCaller
+
+# Server errors retried inside one attempt, like urllib3's Retry in the sync client
+RETRY_STATUSES = (500, 502, 503, 504)
+
+class AsyncSpotifyClient:
+    """
+    Asyncio Spotify client mirroring WorkingSpotifyClient.
+
+    All requests share one httpx.AsyncClient connection pool, so a single
+    event loop can keep many upstream calls in flight without a thread each.
+    The token manager, circuit breakers, catalog and caches can be shared
+    with a WorkingSpotifyClient; anything that may touch SQLite or fetch a
+    token synchronously runs in a worker thread, never on the loop.
+    """
+
+    def __init__(self, client_id: str, client_secret: str, pool_size: int = 100,
+                 timeout: Tuple[float, float] = (3.05, 10.0), max_retries: int = 3,
+                 max_concurrency: int = 8, fanout_timeout: Optional[float] = 5.0,
+                 artist_cache: Optional[ArtistIdCache] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 token_refresh_margin: float = 300,
+                 scheduler: Optional[RequestScheduler] = None,
+                 token_manager: Optional[SpotifyTokenManager] = None,
+                 catalog: Optional[TrackCatalog] = None,
+                 resilience: Optional[ResilientCaller] = None):
+        """
+        Initialize with credentials from environment variables
+
+        Pass a `token_manager` to share tokens with another client; otherwise
+        this client gets its own, renewed in the background.
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = "https://api.spotify.com/v1"
+        self.token_url = "https://accounts.spotify.com/api/token"
+        self.timeout = timeout  # (connect, read) seconds
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency  # Upper bound on parallel calls per fan-out
+        self.fanout_timeout = fanout_timeout  # Per-call limit for fanned-out requests (seconds)
+        self.artist_cache = artist_cache if artist_cache is not None else ArtistIdCache()
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+        self.catalog = catalog
+        self.resilience = resilience if resilience is not None else ResilientCaller()
+        self._revalidating: Dict[Tuple, asyncio.Future] = {}
+        self.scheduler = scheduler if scheduler is not None else get_default_scheduler()
+        self.coalescer = AsyncSingleFlight()
+        connect_timeout, read_timeout = timeout
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            retries=max_retries,  # Retries connection failures only
+        )
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=self._transport,
+        )
+        self._requests_sent = 0
+        if token_manager is None:
+            token_manager = SpotifyTokenManager(self._request_token, refresh_margin=token_refresh_margin)
+            token_manager.prefetch()
+        self.token_manager = token_manager
+
+    async def __aenter__(self) -> "AsyncSpotifyClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the shared connection pool"""
+        await self.http.aclose()
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.token_manager.access_token
+
+    @property
+    def token_expires_at(self) -> Optional[datetime]:
+        return self.token_manager.expires_at
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get HTTP connection pool statistics"""
+        # httpx doesn't expose its pool publicly; report what httpcore knows, if anything
+        connections = getattr(getattr(self._transport, "_pool", None), "connections", [])
+        return {
+            "pool_size": self.pool_size,
+            "requests_sent": self._requests_sent,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+        }
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics for the client's caches"""
+        return {
+            "artist_ids": self.artist_cache.stats(),
+            "responses": self.response_cache.stats(),
+            "catalog": self.catalog.stats() if self.catalog is not None else None
+        }
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get scheduler queue depth, throttle time and 429 metrics"""
+        return self.scheduler.metrics()
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get how many requests were served by an identical in-flight call"""
+        return self.coalescer.stats()
+
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """Get per-endpoint circuit breaker state, hedge win rates and latency percentiles"""
+        return self.resilience.stats()
+
+    def get_token_stats(self) -> Dict[str, Any]:
+        """Get token refresh statistics"""
+        return self.token_manager.stats()
+
+    def _request_token(self) -> Tuple[str, int]:
+        """Get access token using client credentials flow (runs on the token manager's threads)"""
+        credentials = f"{self.client_id}:{self.client_secret}"
+        encoded_credentials = base64.b64encode(credentials.encode()).decode()
+
+        headers = {
+            'Authorization': f'Basic {encoded_credentials}',
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+
+        connect_timeout, read_timeout = self.timeout
+        try:
+            response = httpx.post(self.token_url, headers=headers, data={'grant_type': 'client_credentials'},
+                                  timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+            if response.status_code == 200:
+                token_data = response.json()
+                return token_data['access_token'], token_data.get('expires_in', 3600)
+            else:
+                raise Exception(f"Error getting token: {response.status_code}")
+        except Exception as e:
+            raise Exception(f"Connection error: {e}")
+
+    async def _get_token(self) -> str:
+        """A valid token; only a missing or expired one costs a (threaded) fetch"""
+        token = self.token_manager.peek()
+        if token is None:
+            token = await asyncio.to_thread(self.token_manager.get_token)
+        return token
+
+    async def _get_access_token(self) -> bool:
+        """Force a token refresh through the token manager"""
+        await asyncio.to_thread(self.token_manager.force_refresh)
+        return True
+
+    async def _make_request(self, endpoint: str, params: Dict[str, Any] = None,
+                            cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Make authenticated request to Spotify API, served from the response cache when possible"""
+        key = ResponseCache.key(endpoint, params)
+        ttl = self.response_cache.ttl_for(endpoint) if cache else 0
+        if not ttl:
+            # Identical concurrent requests share one upstream call
+            return await self.coalescer.do(key, lambda: self._fetch_body(endpoint, params))
+
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            if not entry.is_fresh and key not in self._revalidating:
+                # Serve stale immediately; refresh off the request path
+                self._revalidating[key] = asyncio.ensure_future(self._revalidate(key, endpoint, params, entry, ttl))
+            return entry.body
+
+        return await self.coalescer.do(key, lambda: self._fetch_and_store(key, endpoint, params, ttl))
+
+    async def _fetch_body(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return (await self._fetch(endpoint, params))[0]
+
+    async def _fetch_and_store(self, key: Tuple, endpoint: str, params: Optional[Dict[str, Any]],
+                               ttl: float) -> Optional[Dict[str, Any]]:
+        body, etag = await self._fetch(endpoint, params)
+        if body is not None:
+            self.response_cache.store(key, body, etag, ttl)
+        return body
+
+    async def _fetch(self, endpoint: str, params: Dict[str, Any] = None,
+                     etag: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Make authenticated request to Spotify API
+
+        Returns the parsed body and the response ETag. When etag is given it is
+        sent as If-None-Match, and a 304 comes back as (None, etag).
+        """
+        token = await self._get_token()
+        headers = {'Authorization': f'Bearer {token}'}
+        if etag:
+            headers['If-None-Match'] = etag
+        url = f"{self.base_url}{endpoint}"
+
+        try:
+            response = await self._send_scheduled(endpoint, url, headers, params)
+            if response.status_code == 401:
+                # Token revoked or expired early; refresh once and retry
+                fresh = await asyncio.to_thread(self.token_manager.force_refresh, token)
+                headers = {**headers, 'Authorization': f'Bearer {fresh}'}
+                response = await self._send_scheduled(endpoint, url, headers, params)
+            if response.status_code == 200:
+                return response.json(), response.headers.get('ETag')
+            elif response.status_code == 304 and etag:
+                return None, etag
+            else:
+                raise Exception(f"API request failed: {response.status_code}")
+        except Exception as e:
+            raise Exception(f"Request error: {e}")
+
+    async def _send_scheduled(self, endpoint: str, url: str, headers: Dict[str, str],
+                              params: Optional[Dict[str, Any]]) -> httpx.Response:
+        """
+        Send a GET through the rate-limit scheduler, backing off on 429 Retry-After
+
+        Each attempt goes through the endpoint's circuit breaker and is hedged
+        with a duplicate request (which takes its own rate-limit token) when
+        it runs past the endpoint's p95 latency.
+        """
+        async def send() -> httpx.Response:
+            for retry in range(self.max_retries + 1):
+                self._requests_sent += 1
+                response = await self.http.get(url, headers=headers, params=params)
+                if response.status_code not in RETRY_STATUSES or retry == self.max_retries:
+                    return response
+                await asyncio.sleep(0.3 * (2 ** retry))
+            return response
+
+        async def send_hedge() -> httpx.Response:
+            await self.scheduler.acquire_async()
+            return await send()
+
+        for attempt in range(self.scheduler.max_retries + 1):
+            # An open circuit fails fast without spending rate-limit budget
+            self.resilience.check(endpoint)
+            await self.scheduler.acquire_async()
+            response = await self.resilience.acall(
+                endpoint, send, is_failure=lambda r: r.status_code >= 500, hedge_fn=send_hedge
+            )
+            if response.status_code != 429 or attempt == self.scheduler.max_retries:
+                return response
+            self.scheduler.on_rate_limited(parse_retry_after(response.headers.get('Retry-After')))
+        return response
+
+    async def _revalidate(self, key: Tuple, endpoint: str, params: Optional[Dict[str, Any]],
+                          entry: CachedResponse, ttl: float):
+        try:
+            self.response_cache.revalidations += 1
+            # Background refreshes never compete with user-facing requests
+            with request_priority(BATCH):
+                body, etag = await self._fetch(endpoint, params, etag=entry.etag)
+            if body is not None:
+                self.response_cache.store(key, body, etag, ttl)
+            elif etag:
+                self.response_cache.mark_revalidated(key, entry, ttl)
+        except Exception:
+            pass  # Keep serving the stale entry until it ages out
+        finally:
+            self._revalidating.pop(key, None)
+
+    async def search_songs(self, query: str, limit: int = 10) -> List[Track]:
+        """Search for songs, from the local catalog first when one is configured"""
+        if self.catalog is not None:
+            local = await asyncio.to_thread(self.catalog.search, query, min(limit, 50))
+            if local is not None:
+                return local
+
+        params = {'q': query, 'type': 'track', 'limit': min(limit, 50)}
+        result = await self._make_request('/search', params)
+
+        if result and 'tracks' in result:
+            return await self._format_tracks(result['tracks']['items'])
+        return []
+
+    async def get_artist_top_songs(self, artist_name: str, limit: int = 10) -> List[Track]:
+        """Get top songs by a specific artist"""
+        artist_id = await self._get_artist_id(artist_name)
+        if not artist_id:
+            return []
+
+        result = await self._make_request(f'/artists/{artist_id}/top-tracks', {'market': 'US'})
+        if result and 'tracks' in result:
+            return await self._format_tracks(result['tracks'][:limit])
+        return []
+
+    async def get_similar_songs(self, artist_name: str, limit: int = 10, seed: Optional[int] = None) -> List[Track]:
+        """Get similar songs using related artists, shuffled (reproducibly when seeded)"""
+        artist_id = await self._get_artist_id(artist_name)
+        if not artist_id:
+            return []
+
+        # Get related artists
+        related_result = await self._make_request(f'/artists/{artist_id}/related-artists')
+        if not related_result or 'artists' not in related_result:
+            return []
+
+        # Fetch related artists' top tracks concurrently; slow artists are dropped
+        tracks_results = await afan_out([
+            self._make_request(f'/artists/{related_artist["id"]}/top-tracks', {'market': 'US'})
+            for related_artist in related_result['artists'][:5]
+        ], self.max_concurrency, self.fanout_timeout)
+
+        similar_songs = await self._format_tracks([
+            track
+            for tracks_result in tracks_results if tracks_result and 'tracks' in tracks_result
+            for track in tracks_result['tracks'][:2]
+        ])
+
+        shuffle_tracks(similar_songs, seed)
+        return similar_songs[:limit]
+
+    async def get_genre_songs(self, genre: str, limit: int = 10, stop_early: bool = False,
+                              seed: Optional[int] = None) -> List[Track]:
+        """
+        Get songs by genre using search
+
+        The search variants run concurrently and are merged as they arrive.
+        With stop_early, outstanding searches are cancelled as soon as
+        `limit` unique songs have been collected. The result is shuffled,
+        reproducibly when a seed is given (and stop_early is off).
+        """
+        # Search for songs with genre keywords
+        search_queries = [
+            f'genre:"{genre}"',
+            f'{genre} music',
+            f'style:{genre}',
+            f'{genre} songs'
+        ]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def search(query: str) -> List[Track]:
+            async with semaphore:
+                return await asyncio.wait_for(self.search_songs(query, limit=5), self.fanout_timeout)
+
+        # Remove duplicates as results arrive
+        seen_ids = set()
+        unique_songs = []
+        tasks = [asyncio.ensure_future(search(query)) for query in search_queries]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    songs = await next_done
+                except Exception:
+                    continue
+                for song in songs:
+                    if song.id not in seen_ids:
+                        seen_ids.add(song.id)
+                        unique_songs.append(song)
+                if stop_early and len(unique_songs) >= limit:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        shuffle_tracks(unique_songs, seed)
+        return unique_songs[:limit]
+
+    async def get_featured_playlists(self) -> List[Dict[str, Any]]:
+        """Get featured playlists"""
+        result = await self._make_request('/browse/featured-playlists', {'limit': 10, 'country': 'US'})
+        if result and 'playlists' in result:
+            return [format_playlist(playlist) for playlist in result['playlists']['items']]
+        return []
+
+    async def get_playlist_tracks(self, playlist_id: str, limit: int = 10) -> List[Track]:
+        """Get the first `limit` tracks from a playlist, following pagination as needed"""
+        return [track async for track in self.iter_playlist_tracks(playlist_id, limit=limit, cache=True)]
+
+    async def iter_playlist_tracks(self, playlist_id: str, limit: Optional[int] = None,
+                                   page_size: int = PLAYLIST_PAGE_SIZE,
+                                   cache: bool = False) -> AsyncIterator[Track]:
+        """Stream tracks from a playlist, prefetching the next page while this one is consumed"""
+        if limit is not None and limit < 1:
+            return
+        page_size = min(page_size, limit or page_size, PLAYLIST_PAGE_SIZE)
+        request = (f'/playlists/{playlist_id}/tracks', {'limit': page_size, 'offset': 0, 'market': 'US'})
+        pending: Optional[asyncio.Task] = None
+        items_requested = 0
+        yielded = 0
+
+        try:
+            page = await self._make_request(*request, cache=cache)
+            while page and 'items' in page:
+                items_requested += len(page['items'])
+                request = split_api_url(page.get('next'), self.base_url)
+
+                if request and (limit is None or items_requested < limit):
+                    endpoint, params = request
+                    pending = asyncio.ensure_future(self._make_request(endpoint, params, cache))
+
+                page_tracks = await self._format_tracks([
+                    item['track'] for item in page['items']
+                    if item.get('track') and item['track'].get('type') == 'track'
+                ])
+                for track in page_tracks:
+                    yield track
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+
+                if request is None:
+                    return
+                if pending is not None:
+                    page, pending = await pending, None
+                else:
+                    page = await self._make_request(*request, cache=cache)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def get_tracks(self, track_ids: List[str]) -> List[Track]:
+        """Get many tracks by ID using the multi-ID /tracks endpoint, in input order"""
+        unique_ids = list(dict.fromkeys(track_ids))
+        results = await afan_out([
+            self._make_request('/tracks', {'ids': ','.join(chunk), 'market': 'US'})
+            for chunk in chunked(unique_ids, MAX_TRACK_IDS_PER_REQUEST)
+        ], self.max_concurrency, self.fanout_timeout)
+
+        tracks_by_id = {
+            track.id: track
+            for track in await self._format_tracks([
+                track for result in results if result and 'tracks' in result
+                for track in result['tracks'] if track
+            ])
+        }
+        return [tracks_by_id[track_id] for track_id in track_ids if track_id in tracks_by_id]
+
+    async def get_artists(self, artist_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get many artists by ID using the multi-ID /artists endpoint, in input order"""
+        unique_ids = list(dict.fromkeys(artist_ids))
+        results = await afan_out([
+            self._make_request('/artists', {'ids': ','.join(chunk)})
+            for chunk in chunked(unique_ids, MAX_ARTIST_IDS_PER_REQUEST)
+        ], self.max_concurrency, self.fanout_timeout)
+
+        artists_by_id = {}
+        for result in results:
+            if result and 'artists' in result:
+                for artist in result['artists']:
+                    if artist:
+                        artists_by_id[artist['id']] = format_artist(artist)
+        return [artists_by_id[artist_id] for artist_id in artist_ids if artist_id in artists_by_id]
+
+    async def get_artists_top_songs(self, artist_ids: List[str], limit: int = 10) -> Dict[str, List[Track]]:
+        """Get top songs for several artists by ID, fanned out concurrently"""
+        unique_ids = list(dict.fromkeys(artist_ids))
+        results = await afan_out([
+            self._make_request(f'/artists/{artist_id}/top-tracks', {'market': 'US'})
+            for artist_id in unique_ids
+        ], self.max_concurrency, self.fanout_timeout)
+
+        top_songs = {}
+        for artist_id, result in zip(unique_ids, results):
+            tracks = result['tracks'][:limit] if result and 'tracks' in result else []
+            top_songs[artist_id] = await self._format_tracks(tracks)
+        return top_songs
+
+    async def _get_artist_id(self, artist_name: str) -> Optional[str]:
+        """Get Spotify artist ID by name, consulting the artist ID cache first"""
+        cached_id = await self._artist_cache_call(self.artist_cache.get, artist_name)
+        if cached_id is not MISSING:
+            return cached_id
+
+        result = await self._make_request('/search', {'q': artist_name, 'type': 'artist', 'limit': 1})
+        if result is None:
+            return None
+
+        artist_id = None
+        if 'artists' in result and result['artists']['items']:
+            artist_id = result['artists']['items'][0]['id']
+
+        await self._artist_cache_call(self.artist_cache.set, artist_name, artist_id)
+        return artist_id
+
+    async def _artist_cache_call(self, method, *args):
+        """Run an artist cache method, in a worker thread when it may touch its SQLite store"""
+        if self.artist_cache.path:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _format_tracks(self, raw_tracks: List[Dict[str, Any]]) -> List[Track]:
+        """Format tracks, writing them through to the catalog off the event loop"""
+        tracks = [format_track(track) for track in raw_tracks]
+        if self.catalog is not None and tracks:
+            await asyncio.to_thread(self._index, tracks)
+        return tracks
+
+    def _index(self, tracks: List[Track]):
+        for track in tracks:
+            self.catalog.add(track)
@@ -0,0 +1,133 @@
+"""
+Spotify access-token management.
+
+SpotifyTokenManager hands out client-credentials tokens to any number of
+threads. Concurrent callers that find the token missing collapse into a
+single refresh, and a background timer renews the token shortly before it
+expires so no request pays the refresh latency. A failed background
+refresh is retried while the current token stays in service.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+class SpotifyTokenManager:
+    """Thread-safe single-flight token cache with proactive background renewal"""
+
+    def __init__(self, fetch_token: Callable[[], Tuple[str, int]],
+                 refresh_margin: float = 300, retry_interval: float = 15):
+        """
+        Args:
+            fetch_token: Callable returning (access_token, expires_in_seconds)
+            refresh_margin: Renew this many seconds before the token expires
+                (at most half the token's lifetime)
+            retry_interval: Delay before retrying a failed background renewal
+        """
+        self._fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._token: Optional[str] = None
+        self._expires_at = 0.0  # time.monotonic() deadline
+        self._expires_at_wall: Optional[datetime] = None
+        self._refresh_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self.refreshes = 0
+        self.background_refreshes = 0
+        self.failures = 0
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._token
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        return self._expires_at_wall
+
+    def _valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at
+
+    def peek(self) -> Optional[str]:
+        """The current token if it is still valid, else None; never blocks"""
+        token = self._token
+        if token is not None and time.monotonic() < self._expires_at:
+            return token
+        return None
+
+    def get_token(self) -> str:
+        """Return a valid token, blocking only when none is available"""
+        token = self.peek()
+        if token is not None:
+            return token
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not self._valid():
+                self._refresh()
+            return self._token
+
+    def force_refresh(self, stale_token: Optional[str] = None) -> str:
+        """
+        Refresh now, e.g. after a 401. When stale_token is given and another
+        thread has already replaced it, the newer token is returned instead.
+        """
+        with self._refresh_lock:
+            if stale_token is None or self._token == stale_token or not self._valid():
+                self._refresh()
+            return self._token
+
+    def prefetch(self):
+        """Fetch the first token in the background so startup never blocks"""
+        threading.Thread(target=self._background_refresh, name="spotify-token-prefetch", daemon=True).start()
+
+    def _refresh(self):
+        """Fetch a new token; caller must hold _refresh_lock"""
+        try:
+            token, expires_in = self._fetch_token()
+        except Exception:
+            self.failures += 1
+            raise
+        self._token = token
+        self._expires_at = time.monotonic() + expires_in
+        self._expires_at_wall = datetime.now() + timedelta(seconds=expires_in)
+        self.refreshes += 1
+        # Never renew in the first half of the token's life, so a margin at or
+        # above the lifetime can't turn renewal into a tight loop
+        self._schedule(max(expires_in - self.refresh_margin, expires_in / 2))
+
+    def _background_refresh(self):
+        with self._refresh_lock:
+            if self._closed:
+                return
+            try:
+                self._refresh()
+                self.background_refreshes += 1
+            except Exception:
+                # Keep serving the current token and retry while it is still valid;
+                # once it has expired the next get_token() refreshes in the foreground
+                if self._valid():
+                    self._schedule(min(self.retry_interval, self._expires_at - time.monotonic()))
+
+    def _schedule(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._closed:
+            return
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "has_token": self._token is not None,
+            "seconds_to_expiry": max(self._expires_at - time.monotonic(), 0.0) if self._token else 0.0,
+            "refreshes": self.refreshes,
+            "background_refreshes": self.background_refreshes,
+            "failures": self.failures,
+        }
+
+    def close(self):
+        """Stop background renewal"""
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
@@ -0,0 +1,249 @@
+"""
+Caches for Spotify lookups.
+
+TTLCache is a thread-safe in-memory LRU with per-entry expiry. ArtistIdCache
+layers artist-name normalization, negative caching and an optional SQLite
+store on top of it so resolved artist IDs survive process restarts.
+ResponseCache sits under the clients' _make_request and caches slow-changing
+GET responses with per-endpoint TTLs, ETag revalidation and
+stale-while-revalidate.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Pattern, Tuple
+
+# Sentinel distinguishing "not cached" from a cached None (negative entry)
+MISSING = object()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return the cached value, or default when absent or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+class ArtistIdCache:
+    """
+    Artist name -> Spotify artist ID cache.
+
+    Names are normalized (case-folded, whitespace collapsed) so "Taylor Swift"
+    and " taylor  swift" share an entry. Unknown artists are cached as None
+    for a shorter TTL. When a path is given, entries are written through to
+    SQLite and read back on a memory miss, so new workers start warm.
+    """
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = 2048,
+                 ttl: float = 7 * 24 * 3600, negative_ttl: float = 3600):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.path = path
+        self._db = None
+        self._db_lock = threading.Lock()
+        self.disk_hits = 0
+        self.negative_hits = 0
+        if path:
+            self._open_store(path)
+
+    def _open_store(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS artist_ids ("
+            "name TEXT PRIMARY KEY, artist_id TEXT, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def normalize(artist_name: str) -> str:
+        return " ".join(artist_name.casefold().split())
+
+    def get(self, artist_name: str) -> Any:
+        """Return the cached artist ID, None for a known-unknown artist, or MISSING"""
+        key = self.normalize(artist_name)
+        value = self.memory.get(key)
+        if value is MISSING and self._db is not None:
+            value = self._load(key)
+        if value is None:
+            self.negative_hits += 1
+        return value
+
+    def set(self, artist_name: str, artist_id: Optional[str]):
+        """Cache a resolved artist ID, or None when the artist was not found"""
+        key = self.normalize(artist_name)
+        ttl = self.ttl if artist_id else self.negative_ttl
+        self.memory.set(key, artist_id, ttl=ttl)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO artist_ids (name, artist_id, expires_at) VALUES (?, ?, ?)",
+                    (key, artist_id, time.time() + ttl)
+                )
+                self._db.commit()
+
+    def _load(self, key: str) -> Any:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT artist_id, expires_at FROM artist_ids WHERE name = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISSING
+        artist_id, expires_at = row
+        # Promote to memory for the remainder of its lifetime
+        self.memory.set(key, artist_id, ttl=expires_at - time.time())
+        self.disk_hits += 1
+        return artist_id
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        # Memory misses that the disk store answered are hits overall
+        stats["hits"] += self.disk_hits
+        stats["misses"] -= self.disk_hits
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["disk_hits"] = self.disk_hits
+        stats["negative_hits"] = self.negative_hits
+        stats["persistent"] = self._db is not None
+        return stats
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+# Per-endpoint freshness lifetimes in seconds; endpoints not listed are not cached
+DEFAULT_RESPONSE_TTLS = (
+    (r"^/artists/[^/]+/top-tracks$", 6 * 3600),
+    (r"^/artists/[^/]+/related-artists$", 24 * 3600),
+    (r"^/browse/featured-playlists$", 3600),
+    (r"^/playlists/[^/]+/tracks$", 600),
+)
+
+class CachedResponse:
+    """A cached response body with its validator and freshness deadline"""
+
+    __slots__ = ("body", "etag", "fresh_until")
+
+    def __init__(self, body: Any, etag: Optional[str], fresh_until: float):
+        self.body = body
+        self.etag = etag
+        self.fresh_until = fresh_until
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+class ResponseCache:
+    """
+    Size-bounded cache of parsed Spotify GET responses.
+
+    Keys are the endpoint plus its sorted query params. An entry is fresh for
+    its endpoint's TTL, then stays servable for a further stale window while
+    it is revalidated in the background (with If-None-Match when Spotify sent
+    an ETag). Past the stale window it is evicted and the next call blocks.
+    """
+
+    def __init__(self, ttls: Iterable[Tuple[str, float]] = DEFAULT_RESPONSE_TTLS,
+                 maxsize: int = 512, stale_ratio: float = 1.0):
+        self.ttls: Tuple[Tuple[Pattern, float], ...] = tuple((re.compile(pattern), ttl) for pattern, ttl in ttls)
+        self.stale_ratio = stale_ratio  # Stale window as a multiple of the TTL
+        self.entries = TTLCache(maxsize=maxsize)
+        self.stale_hits = 0
+        self.revalidations = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        return (endpoint, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+
+    def ttl_for(self, endpoint: str) -> float:
+        for pattern, ttl in self.ttls:
+            if pattern.match(endpoint):
+                return ttl
+        return 0
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        """Return the entry (fresh or stale) for key, or None"""
+        entry = self.entries.get(key, None)
+        if entry is not None and not entry.is_fresh:
+            self.stale_hits += 1
+        return entry
+
+    def store(self, key: Tuple, body: Any, etag: Optional[str], ttl: float) -> CachedResponse:
+        entry = CachedResponse(body, etag, time.time() + ttl)
+        self.entries.set(key, entry, ttl=ttl * (1 + self.stale_ratio))
+        return entry
+
+    def mark_revalidated(self, key: Tuple, entry: CachedResponse, ttl: float):
+        """Extend an entry's lifetime after a 304 Not Modified"""
+        self.not_modified += 1
+        self.store(key, entry.body, entry.etag, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.entries.stats()
+        stats["stale_hits"] = self.stale_hits
+        stats["revalidations"] = self.revalidations
+        stats["not_modified"] = self.not_modified
+        return stats
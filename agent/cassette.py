@@ -0,0 +1,239 @@
+"""
+Record/replay transport for offline Spotify traffic.
+
+RecordingTransport wraps the live connection pool and saves every
+successful request/response pair to a gzipped JSON cassette. ReplayTransport
+serves those pairs back without touching the network, with optional
+injected latency and error rates, so throughput and load tests are
+reproducible on a machine with no connectivity or credentials.
+
+Both expose the same request/stats/close interface as SpotifySessionPool and
+can be passed to WorkingSpotifyClient as its `http` transport.
+"""
+import atexit
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_VERSION = 1
+
+# Response headers worth replaying; everything else is dropped to keep cassettes small
+RECORDED_HEADERS = ("Content-Type", "ETag", "Cache-Control", "Retry-After")
+
+def interaction_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+    """Match requests on method, URL path and sorted query params (host-independent)"""
+    parsed = urlsplit(url)
+    query = dict(parse_qsl(parsed.query))
+    query.update({k: str(v) for k, v in (params or {}).items()})
+    return (method.upper(), parsed.path, tuple(sorted(query.items())))
+
+def build_response(url: str, status: int, body: Any = None,
+                   headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """Build a requests.Response without going through the network"""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = b"" if body is None else json.dumps(body).encode("utf-8")
+    if body is not None:
+        response.headers.setdefault("Content-Type", "application/json; charset=utf-8")
+    return response
+
+class Cassette:
+    """In-memory set of recorded interactions, persisted as gzipped JSON"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._interactions: Dict[Tuple, Dict[str, Any]] = {}
+        self._dirty = False
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def keys(self) -> List[Tuple]:
+        """(method, path, params) of every recorded interaction"""
+        with self._lock:
+            return list(self._interactions)
+
+    def load(self, path: str):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise Exception(f"Unsupported cassette version: {data.get('version')}")
+        with self._lock:
+            for interaction in data["interactions"]:
+                key = (interaction["method"], interaction["path"], tuple(map(tuple, interaction["params"])))
+                self._interactions[key] = interaction
+
+    def save(self, path: Optional[str] = None):
+        """Write the cassette to disk if anything was recorded since the last save"""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": CASSETTE_VERSION, "interactions": list(self._interactions.values())}
+            self._dirty = False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def record(self, key: Tuple, status: int, headers: Dict[str, str], body: Any):
+        method, path, params = key
+        with self._lock:
+            self._interactions[key] = {
+                "method": method,
+                "path": path,
+                "params": [list(pair) for pair in params],
+                "status": status,
+                "headers": headers,
+                "body": body,
+            }
+            self._dirty = True
+
+    def lookup(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._interactions.get(key)
+
+class RecordingTransport:
+    """Send requests through a live transport and record the responses"""
+
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self._lock = threading.Lock()
+        self._recorded = 0
+        self._skipped = 0
+        atexit.register(self.cassette.save)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        response = self.inner.request(method, url, **kwargs)
+        # Token exchanges are never recorded so cassettes carry no credentials;
+        # 304s depend on request headers and 429/5xx are transient
+        recordable = (
+            method.upper() == "GET"
+            and response.status_code < 500
+            and response.status_code not in (304, 429)
+        )
+        if recordable:
+            try:
+                body = response.json() if response.content else None
+            except ValueError:
+                recordable = False
+        with self._lock:
+            if recordable:
+                self._recorded += 1
+            else:
+                self._skipped += 1
+        if recordable:
+            headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+            self.cassette.record(interaction_key(method, url, kwargs.get("params")), response.status_code, headers, body)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recording = {"recorded": self._recorded, "skipped": self._skipped, "interactions": len(self.cassette)}
+        return {**self.inner.stats(), "mode": "record", "cassette": recording}
+
+    def close(self):
+        self.cassette.save()
+        self.inner.close()
+
+class ReplayTransport:
+    """Serve recorded responses offline, with injected latency and errors"""
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: Optional[int] = None):
+        """
+        Args:
+            cassette: Recorded interactions to serve
+            latency: Added delay per request in seconds
+            jitter: Extra uniformly random delay per request, up to this many seconds
+            error_rate: Fraction of API requests answered with error_status instead
+            error_status: Status code for injected errors (429 responses carry Retry-After)
+            seed: Seed for latency jitter and error injection, for repeatable runs
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hits = 0
+        self._misses = 0
+        self._injected_errors = 0
+        self._not_modified = 0
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+
+        if method.upper() == "POST":
+            # Client-credentials exchange; replay never needs real credentials
+            return build_response(url, 200, {"access_token": "replay-token", "token_type": "Bearer", "expires_in": 3600})
+
+        with self._lock:
+            self._requests += 1
+            inject_error = self.error_rate > 0 and self._random.random() < self.error_rate
+            if inject_error:
+                self._injected_errors += 1
+        if inject_error:
+            headers = {"Retry-After": "1"} if self.error_status == 429 else {}
+            return build_response(url, self.error_status, {"error": {"status": self.error_status, "message": "Injected error"}}, headers)
+
+        interaction = self.cassette.lookup(interaction_key(method, url, kwargs.get("params")))
+        if interaction is None:
+            with self._lock:
+                self._misses += 1
+            return build_response(url, 404, {"error": {"status": 404, "message": "Not in cassette"}})
+
+        headers = dict(interaction["headers"])
+        etag = headers.get("ETag")
+        if etag and (kwargs.get("headers") or {}).get("If-None-Match") == etag:
+            with self._lock:
+                self._hits += 1
+                self._not_modified += 1
+            return build_response(url, 304, headers={"ETag": etag})
+
+        with self._lock:
+            self._hits += 1
+        return build_response(url, interaction["status"], interaction["body"], headers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": "replay",
+                "requests_sent": self._requests,
+                "cassette_hits": self._hits,
+                "cassette_misses": self._misses,
+                "not_modified": self._not_modified,
+                "injected_errors": self._injected_errors,
+                "interactions": len(self.cassette),
+            }
+
+    def close(self):
+        pass
@@ -0,0 +1,225 @@
+"""
+Local full-text catalog of every track the Spotify client has seen.
+
+Tracks are written through from the client as they are formatted and
+indexed with SQLite FTS5 over name, artist and album. A free-text search
+is answered locally when the catalog already holds at least `limit`
+matches; otherwise the caller falls back to Spotify and the results it gets
+back are written through, so coverage grows with use.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .track import Track
+
+# Spotify field filters (artist:, genre:, year:, ...) can't be answered from the local index
+_FIELD_FILTER = re.compile(r"\b[a-z]+:", re.IGNORECASE)
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    artists TEXT NOT NULL,
+    album TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    popularity INTEGER NOT NULL,
+    spotify_url TEXT NOT NULL,
+    preview_url TEXT,
+    album_image_url TEXT,
+    album_image_small TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+    name, artist, album,
+    content='tracks', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS tracks_ai AFTER INSERT ON tracks BEGIN
+    INSERT INTO tracks_fts(rowid, name, artist, album) VALUES (new.rowid, new.name, new.artist, new.album);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_ad AFTER DELETE ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, name, artist, album) VALUES ('delete', old.rowid, old.name, old.artist, old.album);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_au AFTER UPDATE ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, name, artist, album) VALUES ('delete', old.rowid, old.name, old.artist, old.album);
+    INSERT INTO tracks_fts(rowid, name, artist, album) VALUES (new.rowid, new.name, new.artist, new.album);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO tracks (id, name, artist, artists, album, duration_ms, popularity, spotify_url,
+                    preview_url, album_image_url, album_image_small, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    name = excluded.name, artist = excluded.artist, artists = excluded.artists, album = excluded.album,
+    duration_ms = excluded.duration_ms, popularity = excluded.popularity, spotify_url = excluded.spotify_url,
+    preview_url = excluded.preview_url, album_image_url = excluded.album_image_url,
+    album_image_small = excluded.album_image_small, updated_at = excluded.updated_at
+"""
+
+_SEARCH = """
+SELECT t.id, t.name, t.artists, t.album, t.duration_ms, t.popularity, t.spotify_url,
+       t.preview_url, t.album_image_url, t.album_image_small
+FROM tracks_fts JOIN tracks t ON t.rowid = tracks_fts.rowid
+WHERE tracks_fts MATCH ?
+ORDER BY bm25(tracks_fts, 10.0, 5.0, 1.0), t.popularity DESC
+LIMIT ?
+"""
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    Turn a free-text query into an FTS5 expression requiring every term
+
+    Returns None for queries the local index can't answer faithfully (field
+    filters such as genre:rock, or no searchable terms at all).
+    """
+    if _FIELD_FILTER.search(query):
+        return None
+    terms = _TERM.findall(query.casefold())
+    if not terms:
+        return None
+    # Quote each term so FTS5 operators in user input are taken literally
+    return " ".join(f'"{term}"' for term in terms)
+
+class TrackCatalog:
+    """SQLite FTS5 index over tracks seen by the Spotify client"""
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = 200, latency_window: int = 1000):
+        """
+        Args:
+            path: SQLite file to persist the catalog in (None keeps it in memory)
+            batch_size: Tracks buffered before they are written to the index
+            latency_window: Number of recent query latencies kept for percentiles
+        """
+        self.path = path
+        self.batch_size = batch_size
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self._db_lock = threading.Lock()
+
+        self._pending: Dict[str, Track] = {}
+        self._pending_lock = threading.Lock()
+
+        self._indexed = 0
+        self._index_seconds = 0.0
+        self._queries = 0
+        self._local_answers = 0
+        self._fallbacks = 0
+        self._unsupported = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._stats_lock = threading.Lock()
+
+    def add(self, track: Track):
+        """Queue a track for indexing; writes happen in batches"""
+        with self._pending_lock:
+            self._pending[track.id] = track
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write queued tracks to the index"""
+        with self._pending_lock:
+            if not self._pending:
+                return
+            tracks, self._pending = list(self._pending.values()), {}
+
+        now = time.time()
+        rows = [
+            (track.id, track.name, track.artist, json.dumps(track.artists), track.album, track.duration_ms,
+             track.popularity, track.spotify_url, track.preview_url, track.album_image_url,
+             track.album_image_small, now)
+            for track in tracks
+        ]
+        started = time.perf_counter()
+        with self._db_lock:
+            with self._db:
+                self._db.executemany(_UPSERT, rows)
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self._indexed += len(rows)
+            self._index_seconds += elapsed
+
+    def search(self, query: str, limit: int = 10) -> Optional[List[Track]]:
+        """
+        Answer a free-text track search locally
+
+        Returns the best `limit` matches when the catalog holds at least that
+        many, or None when the caller should ask Spotify instead.
+        """
+        expression = match_expression(query)
+        with self._stats_lock:
+            self._queries += 1
+            if expression is None:
+                self._unsupported += 1
+        if expression is None:
+            return None
+
+        self.flush()
+        started = time.perf_counter()
+        with self._db_lock:
+            rows = self._db.execute(_SEARCH, (expression, limit)).fetchall()
+        elapsed = time.perf_counter() - started
+
+        covered = len(rows) >= limit
+        with self._stats_lock:
+            self._latencies.append(elapsed)
+            if covered:
+                self._local_answers += 1
+            else:
+                self._fallbacks += 1
+        if not covered:
+            return None
+        return [
+            Track(track_id, name, tuple(json.loads(artists)), album, duration_ms, popularity,
+                  spotify_url, preview_url, album_image_url, album_image_small)
+            for (track_id, name, artists, album, duration_ms, popularity, spotify_url,
+                 preview_url, album_image_url, album_image_small) in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        with self._db_lock:
+            tracks = self._db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+            page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            answered = self._local_answers + self._fallbacks
+            return {
+                "tracks": tracks,
+                "pending": pending,
+                "size_bytes": page_count * page_size,
+                "persistent": bool(self.path),
+                "indexed": self._indexed,
+                "build_rate_tracks_per_second": self._indexed / self._index_seconds if self._index_seconds else 0.0,
+                "queries": self._queries,
+                "local_answers": self._local_answers,
+                "fallbacks": self._fallbacks,
+                "unsupported_queries": self._unsupported,
+                "local_answer_ratio": self._local_answers / answered if answered else 0.0,
+                "query_latency_ms": {
+                    "p50": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+                    "p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000 if latencies else 0.0,
+                },
+            }
+
+    def close(self):
+        self.flush()
+        with self._db_lock:
+            self._db.close()
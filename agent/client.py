@@ -1,24 +1,251 @@
 import requests
 import base64
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import threading
+import contextvars
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+from datetime import datetime
 import random
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .auth import SpotifyTokenManager
+from .coalesce import SingleFlight
+from .cache import ArtistIdCache, ResponseCache, CachedResponse, MISSING
+from .rate_limit import RequestScheduler, get_default_scheduler, parse_retry_after, request_priority, BATCH
+from .concurrency import fan_out, iter_completed
+from .track import Track
+from .catalog import TrackCatalog
+from .resilience import ResilientCaller
+
+# Spotify's maximum number of IDs per multi-ID request
+MAX_TRACK_IDS_PER_REQUEST = 50
+MAX_ARTIST_IDS_PER_REQUEST = 50
+PLAYLIST_PAGE_SIZE = 100
+
+def chunked(items: List[str], size: int) -> List[List[str]]:
+    """Split items into consecutive chunks of at most size"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def format_track(track: Dict[str, Any]) -> Track:
+    """Format track data consistently"""
+    return Track.from_spotify(track)
+
+def format_artist(artist: Dict[str, Any]) -> Dict[str, Any]:
+    """Format artist data consistently"""
+    images = artist.get('images') or []
+    return {
+        'id': artist['id'],
+        'name': artist['name'],
+        'genres': artist.get('genres', []),
+        'popularity': artist.get('popularity', 0),
+        'followers': artist.get('followers', {}).get('total', 0),
+        'spotify_url': artist['external_urls']['spotify'],
+        'image_url': images[0].get('url') if images else None
+    }
+
+def format_playlist(playlist: Dict[str, Any]) -> Dict[str, Any]:
+    """Format playlist summary data consistently"""
+    return {
+        'name': playlist['name'],
+        'description': playlist.get('description', ''),
+        'tracks_total': playlist['tracks']['total'],
+        'spotify_url': playlist['external_urls']['spotify'],
+        'id': playlist['id']
+    }
+
+def split_api_url(url: Optional[str], base_url: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """Turn an absolute API URL (e.g. a `next` cursor) into an (endpoint, params) pair"""
+    if not url:
+        return None
+    parsed = urlsplit(url)
+    base_path = urlsplit(base_url).path
+    endpoint = parsed.path[len(base_path):] if parsed.path.startswith(base_path) else parsed.path
+    return endpoint, dict(parse_qsl(parsed.query))
+
+def shuffle_tracks(tracks: List[Track], seed: Optional[int] = None):
+    """Shuffle in place; with a seed the order depends only on the seed and the set of tracks"""
+    if seed is None:
+        random.shuffle(tracks)
+    else:
+        tracks.sort(key=lambda track: track.id)
+        random.Random(seed).shuffle(tracks)
+
+def format_duration(duration_ms: int) -> str:
+    """Convert milliseconds to MM:SS format"""
+    seconds = duration_ms // 1000
+    minutes = seconds // 60
+    seconds = seconds % 60
+    return f"{minutes}:{seconds:02d}"
+
+class SpotifySessionPool:
+    """
+    Keep-alive connection pool shared by every thread using a client.
+
+    A single HTTPAdapter (and therefore a single urllib3 PoolManager) is
+    shared, while each thread gets its own lightweight requests.Session
+    mounted on it, so cookie/header state is never shared between threads
+    but TCP+TLS connections are reused across all of them.
+    """
+
+    def __init__(self, pool_size: int = 20, max_retries: int = 3, backoff_factor: float = 0.3):
+        self.pool_size = pool_size
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),  # Only idempotent requests are retried
+            # 429s must reach the shared RequestScheduler, which pauses every lane for Retry-After
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions_created = 0
+        self._requests_sent = 0
+
+    @property
+    def session(self) -> requests.Session:
+        """Return the calling thread's session, creating it on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions_created += 1
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the calling thread's pooled session"""
+        with self._lock:
+            self._requests_sent += 1
+        return self.session.request(method, url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report per-host connection pool statistics"""
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[f"{key.key_scheme}://{key.key_host}"] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle_connections": pool.pool.qsize() if pool.pool is not None else 0,
+                "max_size": pool.pool.maxsize if pool.pool is not None else self.pool_size,
+            }
+
+        with self._lock:
+            requests_sent = self._requests_sent
+            sessions_created = self._sessions_created
+
+        connections_opened = sum(host["connections_opened"] for host in hosts.values())
+        return {
+            "pool_size": self.pool_size,
+            "sessions": sessions_created,
+            "requests_sent": requests_sent,
+            "connections_opened": connections_opened,
+            "connection_reuse_ratio": 1 - connections_opened / requests_sent if requests_sent else 0.0,
+            "hosts": hosts,
+        }
+
+    def close(self):
+        """Close all pooled connections"""
+        self.adapter.close()
 
 class WorkingSpotifyClient:
     """Spotify client that works with current API limitations"""
 
-    def __init__(self, client_id: str, client_secret: str):
-        """Initialize with credentials from environment variables"""
+    def __init__(self, client_id: str, client_secret: str, pool_size: int = 20,
+                 timeout: Tuple[float, float] = (3.05, 10.0), max_retries: int = 3,
+                 max_concurrency: int = 8, fanout_timeout: Optional[float] = 5.0,
+                 artist_cache: Optional[ArtistIdCache] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 token_refresh_margin: float = 300,
+                 scheduler: Optional[RequestScheduler] = None,
+                 http: Optional[Any] = None,
+                 catalog: Optional[TrackCatalog] = None,
+                 resilience: Optional[ResilientCaller] = None):
+        """
+        Initialize with credentials from environment variables
+
+        `http` replaces the live connection pool with any transport exposing
+        request/stats/close, such as the record/replay transports in cassette.py.
+        With a `catalog`, every formatted track is indexed locally and
+        search_songs is answered from the index when it has enough matches.
+        """
         self.client_id = client_id
         self.client_secret = client_secret
-        self.access_token = None
-        self.token_expires_at = None
         self.base_url = "https://api.spotify.com/v1"
-        self._get_access_token()
+        self.token_url = "https://accounts.spotify.com/api/token"
+        self.timeout = timeout  # (connect, read) seconds
+        self.http = http if http is not None else SpotifySessionPool(pool_size=pool_size, max_retries=max_retries)
+        self.max_concurrency = max_concurrency  # Upper bound on parallel calls per fan-out
+        self.fanout_timeout = fanout_timeout  # Per-call limit for fanned-out requests (seconds)
+        self.artist_cache = artist_cache if artist_cache is not None else ArtistIdCache()
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+        self.catalog = catalog
+        self.resilience = resilience if resilience is not None else ResilientCaller(max_workers=pool_size)
+        self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="spotify-revalidate")
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        self.scheduler = scheduler if scheduler is not None else get_default_scheduler()
+        self.coalescer = SingleFlight()
+        self.token_manager = SpotifyTokenManager(self._request_token, refresh_margin=token_refresh_margin)
+        self.token_manager.prefetch()
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.token_manager.access_token
+
+    @property
+    def token_expires_at(self) -> Optional[datetime]:
+        return self.token_manager.expires_at
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get HTTP connection pool statistics"""
+        return self.http.stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics for the client's caches"""
+        return {
+            "artist_ids": self.artist_cache.stats(),
+            "responses": self.response_cache.stats(),
+            "catalog": self.catalog.stats() if self.catalog is not None else None
+        }
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get scheduler queue depth, throttle time and 429 metrics"""
+        return self.scheduler.metrics()
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get how many requests were served by an identical in-flight call"""
+        return self.coalescer.stats()
+
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """Get per-endpoint circuit breaker state, hedge win rates and latency percentiles"""
+        return self.resilience.stats()
+
+    def get_token_stats(self) -> Dict[str, Any]:
+        """Get token refresh statistics"""
+        return self.token_manager.stats()
 
     def _get_access_token(self) -> bool:
+        """Force a token refresh through the token manager"""
+        self.token_manager.force_refresh()
+        return True
+
+    def _request_token(self) -> Tuple[str, int]:
         """Get access token using client credentials flow"""
-        url = "https://accounts.spotify.com/api/token"
+        url = self.token_url
         credentials = f"{self.client_id}:{self.client_secret}"
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
 
@@ -28,38 +255,135 @@ class WorkingSpotifyClient:
         }
 
         try:
-            response = requests.post(url, headers=headers, data={'grant_type': 'client_credentials'})
+            response = self.http.request('POST', url, headers=headers, data={'grant_type': 'client_credentials'}, timeout=self.timeout)
             if response.status_code == 200:
                 token_data = response.json()
-                self.access_token = token_data['access_token']
-                expires_in = token_data.get('expires_in', 3600)
-                self.token_expires_at = datetime.now() + timedelta(seconds=expires_in)
-                return True
+                return token_data['access_token'], token_data.get('expires_in', 3600)
             else:
                 raise Exception(f"Error getting token: {response.status_code}")
         except Exception as e:
             raise Exception(f"Connection error: {e}")
 
-    def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
-        """Make authenticated request to Spotify API"""
-        if not self.access_token or datetime.now() >= self.token_expires_at:
-            if not self._get_access_token():
-                return None
+    def _make_request(self, endpoint: str, params: Dict[str, Any] = None,
+                      cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Make authenticated request to Spotify API, served from the response cache when possible
+
+        Pass cache=False for one-off reads (e.g. streamed playlist pages) that
+        should not displace hot entries from the response cache.
+        """
+        key = ResponseCache.key(endpoint, params)
+        ttl = self.response_cache.ttl_for(endpoint) if cache else 0
+        if not ttl:
+            # Identical concurrent requests share one upstream call
+            return self.coalescer.do(key, lambda: self._fetch(endpoint, params)[0])
+
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            if not entry.is_fresh:
+                # Serve stale immediately; refresh off the request path
+                self._revalidate_in_background(key, endpoint, params, entry, ttl)
+            return entry.body
+
+        return self.coalescer.do(key, lambda: self._fetch_and_store(key, endpoint, params, ttl))
+
+    def _fetch_and_store(self, key: Tuple, endpoint: str, params: Optional[Dict[str, Any]],
+                         ttl: float) -> Optional[Dict[str, Any]]:
+        body, etag = self._fetch(endpoint, params)
+        if body is not None:
+            self.response_cache.store(key, body, etag, ttl)
+        return body
 
-        headers = {'Authorization': f'Bearer {self.access_token}'}
+    def _fetch(self, endpoint: str, params: Dict[str, Any] = None,
+               etag: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Make authenticated request to Spotify API
+
+        Returns the parsed body and the response ETag. When etag is given it is
+        sent as If-None-Match, and a 304 comes back as (None, etag).
+        """
+        token = self.token_manager.get_token()
+        headers = {'Authorization': f'Bearer {token}'}
+        if etag:
+            headers['If-None-Match'] = etag
         url = f"{self.base_url}{endpoint}"
 
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self._send_scheduled(endpoint, url, headers, params)
+            if response.status_code == 401:
+                # Token revoked or expired early; refresh once and retry
+                headers = {**headers, 'Authorization': f'Bearer {self.token_manager.force_refresh(stale_token=token)}'}
+                response = self._send_scheduled(endpoint, url, headers, params)
             if response.status_code == 200:
-                return response.json()
+                return response.json(), response.headers.get('ETag')
+            elif response.status_code == 304 and etag:
+                return None, etag
             else:
                 raise Exception(f"API request failed: {response.status_code}")
         except Exception as e:
             raise Exception(f"Request error: {e}")
 
-    def search_songs(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search for songs"""
+    def _send_scheduled(self, endpoint: str, url: str, headers: Dict[str, str],
+                        params: Optional[Dict[str, Any]]) -> requests.Response:
+        """
+        Send a GET through the rate-limit scheduler, backing off on 429 Retry-After
+
+        Each attempt goes through the endpoint's circuit breaker and is hedged
+        with a duplicate request (which takes its own rate-limit token) when
+        it runs past the endpoint's p95 latency.
+        """
+        def send() -> requests.Response:
+            return self.http.request('GET', url, headers=headers, params=params, timeout=self.timeout)
+
+        def send_hedge() -> requests.Response:
+            self.scheduler.acquire()
+            return send()
+
+        for attempt in range(self.scheduler.max_retries + 1):
+            # An open circuit fails fast without spending rate-limit budget
+            self.resilience.check(endpoint)
+            self.scheduler.acquire()
+            response = self.resilience.call(
+                endpoint, send, is_failure=lambda r: r.status_code >= 500, hedge_fn=send_hedge
+            )
+            if response.status_code != 429 or attempt == self.scheduler.max_retries:
+                return response
+            self.scheduler.on_rate_limited(parse_retry_after(response.headers.get('Retry-After')))
+        return response
+
+    def _revalidate_in_background(self, key: Tuple, endpoint: str, params: Optional[Dict[str, Any]],
+                                  entry: CachedResponse, ttl: float):
+        """Schedule at most one background refresh per stale cache key"""
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        self._background.submit(self._revalidate, key, endpoint, params, entry, ttl)
+
+    def _revalidate(self, key: Tuple, endpoint: str, params: Optional[Dict[str, Any]],
+                    entry: CachedResponse, ttl: float):
+        try:
+            self.response_cache.revalidations += 1
+            # Background refreshes never compete with user-facing requests
+            with request_priority(BATCH):
+                body, etag = self._fetch(endpoint, params, etag=entry.etag)
+            if body is not None:
+                self.response_cache.store(key, body, etag, ttl)
+            elif etag:
+                self.response_cache.mark_revalidated(key, entry, ttl)
+        except Exception:
+            pass  # Keep serving the stale entry until it ages out
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.discard(key)
+
+    def search_songs(self, query: str, limit: int = 10) -> List[Track]:
+        """Search for songs, from the local catalog first when one is configured"""
+        if self.catalog is not None:
+            local = self.catalog.search(query, min(limit, 50))
+            if local is not None:
+                return local
+
         params = {'q': query, 'type': 'track', 'limit': min(limit, 50)}
         result = self._make_request('/search', params)
 
@@ -67,7 +391,7 @@ class WorkingSpotifyClient:
             return [self._format_track(track) for track in result['tracks']['items']]
         return []
 
-    def get_artist_top_songs(self, artist_name: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_artist_top_songs(self, artist_name: str, limit: int = 10) -> List[Track]:
         """Get top songs by a specific artist"""
         artist_id = self._get_artist_id(artist_name)
         if not artist_id:
@@ -78,8 +402,8 @@ class WorkingSpotifyClient:
             return [self._format_track(track) for track in result['tracks'][:limit]]
         return []
 
-    def get_similar_songs(self, artist_name: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get similar songs using related artists"""
+    def get_similar_songs(self, artist_name: str, limit: int = 10, seed: Optional[int] = None) -> List[Track]:
+        """Get similar songs using related artists, shuffled (reproducibly when seeded)"""
         artist_id = self._get_artist_id(artist_name)
         if not artist_id:
             return []
@@ -89,18 +413,35 @@ class WorkingSpotifyClient:
         if not related_result or 'artists' not in related_result:
             return []
 
+        # Fetch related artists' top tracks concurrently; slow artists are dropped
+        tracks_results = fan_out(
+            [
+                partial(self._make_request, f'/artists/{related_artist["id"]}/top-tracks', {'market': 'US'})
+                for related_artist in related_result['artists'][:5]
+            ],
+            max_concurrency=self.max_concurrency,
+            timeout=self.fanout_timeout
+        )
+
         similar_songs = []
-        for related_artist in related_result['artists'][:5]:
-            tracks_result = self._make_request(f'/artists/{related_artist["id"]}/top-tracks', {'market': 'US'})
+        for tracks_result in tracks_results:
             if tracks_result and 'tracks' in tracks_result:
                 for track in tracks_result['tracks'][:2]:
                     similar_songs.append(self._format_track(track))
 
-        random.shuffle(similar_songs)
+        shuffle_tracks(similar_songs, seed)
         return similar_songs[:limit]
 
-    def get_genre_songs(self, genre: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get songs by genre using search"""
+    def get_genre_songs(self, genre: str, limit: int = 10, stop_early: bool = False,
+                        seed: Optional[int] = None) -> List[Track]:
+        """
+        Get songs by genre using search
+
+        The search variants run concurrently and are merged as they arrive.
+        With stop_early, outstanding searches are abandoned as soon as
+        `limit` unique songs have been collected. The result is shuffled,
+        reproducibly when a seed is given (and stop_early is off).
+        """
         # Search for songs with genre keywords
         search_queries = [
             f'genre:"{genre}"',
@@ -109,94 +450,193 @@ class WorkingSpotifyClient:
             f'{genre} songs'
         ]
 
-        all_songs = []
-        for query in search_queries:
-            songs = self.search_songs(query, limit=5)
-            all_songs.extend(songs)
-
-        # Remove duplicates
+        # Remove duplicates as results arrive
         seen_ids = set()
         unique_songs = []
-        for song in all_songs:
-            if song['id'] not in seen_ids:
-                seen_ids.add(song['id'])
-                unique_songs.append(song)
+        results = iter_completed(
+            [partial(self.search_songs, query, limit=5) for query in search_queries],
+            max_concurrency=self.max_concurrency,
+            timeout=self.fanout_timeout
+        )
+        for songs in results:
+            for song in songs:
+                if song.id not in seen_ids:
+                    seen_ids.add(song.id)
+                    unique_songs.append(song)
+            if stop_early and len(unique_songs) >= limit:
+                results.close()
+                break
 
-        random.shuffle(unique_songs)
+        shuffle_tracks(unique_songs, seed)
         return unique_songs[:limit]
 
     def get_featured_playlists(self) -> List[Dict[str, Any]]:
         """Get featured playlists"""
         result = self._make_request('/browse/featured-playlists', {'limit': 10, 'country': 'US'})
         if result and 'playlists' in result:
-            playlists = []
-            for playlist in result['playlists']['items']:
-                playlists.append({
-                    'name': playlist['name'],
-                    'description': playlist.get('description', ''),
-                    'tracks_total': playlist['tracks']['total'],
-                    'spotify_url': playlist['external_urls']['spotify'],
-                    'id': playlist['id']
-                })
-            return playlists
+            return [format_playlist(playlist) for playlist in result['playlists']['items']]
         return []
 
-    def get_playlist_tracks(self, playlist_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get tracks from a playlist"""
-        result = self._make_request(f'/playlists/{playlist_id}/tracks', {'limit': limit, 'market': 'US'})
-        if result and 'items' in result:
-            tracks = []
-            for item in result['items']:
-                if item.get('track') and item['track'].get('type') == 'track':
-                    tracks.append(self._format_track(item['track']))
-            return tracks
-        return []
+    def get_playlist_tracks(self, playlist_id: str, limit: int = 10) -> List[Track]:
+        """Get the first `limit` tracks from a playlist, following pagination as needed"""
+        return list(self.iter_playlist_tracks(playlist_id, limit=limit, cache=True))
+
+    def iter_playlist_tracks(self, playlist_id: str, limit: Optional[int] = None,
+                             page_size: int = PLAYLIST_PAGE_SIZE, cache: bool = False) -> Iterator[Track]:
+        """
+        Stream tracks from a playlist, following Spotify's `next` cursors
+
+        While the current page is being consumed, the next one is prefetched
+        in the background. Only the current and next raw pages are held at a
+        time, so memory stays flat for very large playlists. Closing the
+        iterator early (or reaching `limit`) stops further page requests.
+
+        Args:
+            playlist_id: Spotify playlist ID
+            limit: Maximum number of tracks to yield (None for the whole playlist)
+            page_size: Items requested per page (Spotify allows up to 100)
+            cache: Whether pages go through the response cache
+        """
+        if limit is not None and limit < 1:
+            return
+        page_size = min(page_size, limit or page_size, PLAYLIST_PAGE_SIZE)
+        request = (f'/playlists/{playlist_id}/tracks', {'limit': page_size, 'offset': 0, 'market': 'US'})
+        prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spotify-playlist-prefetch")
+        pending = None
+        items_requested = 0
+        yielded = 0
+
+        try:
+            page = self._make_request(*request, cache=cache)
+            while page and 'items' in page:
+                items_requested += len(page['items'])
+                request = split_api_url(page.get('next'), self.base_url)
+
+                # Fetch the next page while this one is consumed, unless it can't be needed
+                if request and (limit is None or items_requested < limit):
+                    endpoint, params = request
+                    pending = prefetcher.submit(
+                        contextvars.copy_context().run, self._make_request, endpoint, params, cache
+                    )
+
+                for item in page['items']:
+                    if item.get('track') and item['track'].get('type') == 'track':
+                        yield self._format_track(item['track'])
+                        yielded += 1
+                        if limit is not None and yielded >= limit:
+                            return
+
+                if request is None:
+                    return
+                if pending is not None:
+                    page, pending = pending.result(), None
+                else:
+                    page = self._make_request(*request, cache=cache)
+        finally:
+            if pending is not None:
+                pending.cancel()
+            prefetcher.shutdown(wait=False, cancel_futures=True)
+
+    def get_tracks(self, track_ids: List[str]) -> List[Track]:
+        """
+        Get many tracks by ID using the multi-ID /tracks endpoint
+
+        IDs are deduplicated and chunked at the API maximum, with chunks
+        fetched concurrently. Tracks come back in input order; unknown IDs
+        and chunks that fail are skipped.
+        """
+        unique_ids = list(dict.fromkeys(track_ids))
+        results = fan_out(
+            [
+                partial(self._make_request, '/tracks', {'ids': ','.join(chunk), 'market': 'US'})
+                for chunk in chunked(unique_ids, MAX_TRACK_IDS_PER_REQUEST)
+            ],
+            max_concurrency=self.max_concurrency,
+            timeout=self.fanout_timeout
+        )
+
+        tracks_by_id = {}
+        for result in results:
+            if result and 'tracks' in result:
+                for track in result['tracks']:
+                    if track:
+                        tracks_by_id[track['id']] = self._format_track(track)
+        return [tracks_by_id[track_id] for track_id in track_ids if track_id in tracks_by_id]
+
+    def get_artists(self, artist_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get many artists by ID using the multi-ID /artists endpoint
+
+        IDs are deduplicated and chunked at the API maximum, with chunks
+        fetched concurrently. Artists come back in input order; unknown IDs
+        and chunks that fail are skipped.
+        """
+        unique_ids = list(dict.fromkeys(artist_ids))
+        results = fan_out(
+            [
+                partial(self._make_request, '/artists', {'ids': ','.join(chunk)})
+                for chunk in chunked(unique_ids, MAX_ARTIST_IDS_PER_REQUEST)
+            ],
+            max_concurrency=self.max_concurrency,
+            timeout=self.fanout_timeout
+        )
+
+        artists_by_id = {}
+        for result in results:
+            if result and 'artists' in result:
+                for artist in result['artists']:
+                    if artist:
+                        artists_by_id[artist['id']] = format_artist(artist)
+        return [artists_by_id[artist_id] for artist_id in artist_ids if artist_id in artists_by_id]
+
+    def get_artists_top_songs(self, artist_ids: List[str], limit: int = 10) -> Dict[str, List[Track]]:
+        """
+        Get top songs for several artists by ID
+
+        Spotify has no multi-artist top-tracks endpoint, so the lookups are
+        fanned out concurrently. Returns {artist_id: songs} in input order,
+        with an empty list for artists whose lookup failed.
+        """
+        unique_ids = list(dict.fromkeys(artist_ids))
+        results = fan_out(
+            [
+                partial(self._make_request, f'/artists/{artist_id}/top-tracks', {'market': 'US'})
+                for artist_id in unique_ids
+            ],
+            max_concurrency=self.max_concurrency,
+            timeout=self.fanout_timeout
+        )
+
+        top_songs = {}
+        for artist_id, result in zip(unique_ids, results):
+            tracks = result['tracks'][:limit] if result and 'tracks' in result else []
+            top_songs[artist_id] = [self._format_track(track) for track in tracks]
+        return top_songs
 
     def _get_artist_id(self, artist_name: str) -> Optional[str]:
-        """Get Spotify artist ID by name"""
+        """Get Spotify artist ID by name, consulting the artist ID cache first"""
+        cached_id = self.artist_cache.get(artist_name)
+        if cached_id is not MISSING:
+            return cached_id
+
         result = self._make_request('/search', {'q': artist_name, 'type': 'artist', 'limit': 1})
-        if result and 'artists' in result and result['artists']['items']:
-            return result['artists']['items'][0]['id']
-        return None
+        if result is None:
+            return None
 
-    def _format_track(self, track: Dict[str, Any]) -> Dict[str, Any]:
-        """Format track data consistently"""
-        # Extract album images
-        album_images = track.get('album', {}).get('images', [])
-        album_image_url = None
-        album_image_small = None
-
-        # Get the best image sizes (Spotify typically returns 640x640, 300x300, 64x64)
-        for image in album_images:
-            if image.get('height') == 640:  # Large image
-                album_image_url = image.get('url')
-            elif image.get('height') == 64:  # Small image
-                album_image_small = image.get('url')
-
-        # If no exact sizes found, use first available as large, last as small
-        if not album_image_url and album_images:
-            album_image_url = album_images[0].get('url')
-        if not album_image_small and len(album_images) > 1:
-            album_image_small = album_images[-1].get('url')
-        elif not album_image_small and album_images:
-            album_image_small = album_images[0].get('url')
+        artist_id = None
+        if 'artists' in result and result['artists']['items']:
+            artist_id = result['artists']['items'][0]['id']
 
-        return {
-            'id': track['id'],
-            'name': track['name'],
-            'artist': ', '.join([artist['name'] for artist in track['artists']]),
-            'album': track['album']['name'],
-            'duration': self._format_duration(track['duration_ms']),
-            'popularity': track['popularity'],
-            'spotify_url': track['external_urls']['spotify'],
-            'preview_url': track.get('preview_url'),
-            'album_image_url': album_image_url,
-            'album_image_small': album_image_small
-        }
+        self.artist_cache.set(artist_name, artist_id)
+        return artist_id
+
+    def _format_track(self, track: Dict[str, Any]) -> Track:
+        """Format track data consistently, writing it through to the catalog"""
+        formatted = format_track(track)
+        if self.catalog is not None:
+            self.catalog.add(formatted)
+        return formatted
 
     def _format_duration(self, duration_ms: int) -> str:
         """Convert milliseconds to MM:SS format"""
-        seconds = duration_ms // 1000
-        minutes = seconds // 60
-        seconds = seconds % 60
-        return f"{minutes}:{seconds:02d}"
\ No newline at end of file
+        return format_duration(duration_ms)
@@ -0,0 +1,98 @@
+"""
+In-flight request coalescing.
+
+When many callers ask for the same Spotify resource at once (a trending
+artist, a popular search), only the first caller goes upstream; the rest
+wait for it and share its parsed result. SingleFlight does this for
+threads, AsyncSingleFlight for coroutines.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class _InFlightCall:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class _CoalescingStats:
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+
+    def stats(self, in_flight: int) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.calls - self.coalesced,
+            "coalesce_ratio": self.coalesced / self.calls if self.calls else 0.0,
+            "in_flight": in_flight,
+        }
+
+class SingleFlight(_CoalescingStats):
+    """Collapse concurrent identical calls from multiple threads into one"""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, _InFlightCall] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run fn for key, or wait for the identical call already in flight"""
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _InFlightCall()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return super().stats(len(self._in_flight))
+
+class AsyncSingleFlight(_CoalescingStats):
+    """Collapse concurrent identical coroutine calls into one task"""
+
+    def __init__(self):
+        super().__init__()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn() for key, or share the identical call already in flight"""
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return super().stats(len(self._in_flight))
@@ -0,0 +1,114 @@
+"""
+Concurrency helpers for fanning out blocking Spotify calls.
+
+Each fan-out gets its own short-lived thread pool so nested fan-outs (a
+playlist seed that itself runs several searches) can never deadlock on a
+shared, exhausted executor. afan_out is the coroutine counterpart for the
+async tools.
+"""
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+def _run_concurrently(calls: List[Callable[[], T]], max_concurrency: int,
+                      timeout: Optional[float]) -> Iterator[Tuple[int, T]]:
+    """Yield (index, result) pairs as calls finish, skipping failures and timeouts"""
+    if not calls:
+        return
+
+    started: Dict[int, float] = {}
+
+    def run(index: int, call: Callable[[], T]) -> T:
+        started[index] = time.monotonic()
+        return call()
+
+    executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(calls)), thread_name_prefix="spotify-fanout")
+    # Each call runs in a copy of the caller's context so context variables
+    # such as the request priority lane follow the work onto pool threads
+    futures: List[Future] = [
+        executor.submit(contextvars.copy_context().run, run, i, call)
+        for i, call in enumerate(calls)
+    ]
+    index_of = {future: i for i, future in enumerate(futures)}
+
+    try:
+        pending = set(futures)
+        while pending:
+            if timeout is None:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                now = time.monotonic()
+                # Drop calls that have been running longer than the per-call timeout
+                expired = {f for f in pending if index_of[f] in started and now - started[index_of[f]] >= timeout}
+                pending -= expired
+                if not pending:
+                    break
+
+                deadlines = [started[index_of[f]] + timeout for f in pending if index_of[f] in started]
+                wait_for = max(min(deadlines) - now, 0.0) if deadlines else timeout
+                done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            pending -= done
+            for future in sorted(done, key=index_of.get):
+                if not future.cancelled() and future.exception() is None:
+                    yield index_of[future], future.result()
+    finally:
+        # Never block on stragglers, and skip queued calls nobody wants any more
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def fan_out(calls: List[Callable[[], T]], max_concurrency: int = 8,
+            timeout: Optional[float] = None) -> List[Optional[T]]:
+    """
+    Run calls concurrently and return their results in input order.
+
+    Args:
+        calls: Zero-argument callables to run
+        max_concurrency: Maximum number of calls in flight at once
+        timeout: Per-call limit in seconds, measured from when each call starts
+
+    Returns:
+        One entry per call; None where the call failed or timed out
+    """
+    results: List[Optional[T]] = [None] * len(calls)
+    for index, result in _run_concurrently(calls, max_concurrency, timeout):
+        results[index] = result
+    return results
+
+def iter_completed(calls: List[Callable[[], T]], max_concurrency: int = 8,
+                   timeout: Optional[float] = None) -> Iterator[T]:
+    """
+    Run calls concurrently and yield results in completion order.
+
+    Failed and timed-out calls are skipped. Closing the iterator early (e.g.
+    breaking out of the loop) cancels every call that has not started yet.
+    """
+    for _, result in _run_concurrently(calls, max_concurrency, timeout):
+        yield result
+
+async def afan_out(coros: List[Awaitable[T]], max_concurrency: int = 8,
+                   timeout: Optional[float] = None) -> List[Optional[T]]:
+    """
+    Await coroutines concurrently and return their results in input order.
+
+    Args:
+        coros: Coroutines to await
+        max_concurrency: Maximum number of coroutines in flight at once
+        timeout: Per-coroutine limit in seconds, measured from when each one starts
+
+    Returns:
+        One entry per coroutine; None where it failed or timed out
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def run(coro: Awaitable[T]) -> Optional[T]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(coro, timeout)
+            except Exception:
+                return None
+
+    return await asyncio.gather(*[run(coro) for coro in coros])
@@ -1,5 +1,4 @@
 import os
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -13,6 +12,15 @@ os.environ["LANGCHAIN_PROJECT"] = LANGSMITH_PROJECT
 # Agent Configuration
 AGENT_MAX_ITERATIONS = 25
 AGENT_MAX_EXECUTION_TIME = 300  # seconds
+AGENT_MODEL = "gpt-4o-mini"
+AGENT_MODE = os.getenv("AGENT_MODE", "react").lower()  # "react" or "tool_calling"
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "4"))  # pre-built agents shared by the API and evaluations
+AGENT_POOL_TIMEOUT = float(os.getenv("AGENT_POOL_TIMEOUT", "60"))  # seconds to wait for a free agent
+
+# Observation Compaction (what the agent's scratchpad shows of each tool result)
+COMPACT_OBSERVATIONS = os.getenv("COMPACT_OBSERVATIONS", "true").lower() == "true"
+OBSERVATION_TOKEN_BUDGET = int(os.getenv("OBSERVATION_TOKEN_BUDGET", "200"))  # tokens per observation
+OBSERVATION_EXEMPLARS = int(os.getenv("OBSERVATION_EXEMPLARS", "3"))  # example tracks per observation
 
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -20,10 +28,53 @@ SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
+# Spotify HTTP Configuration
+SPOTIFY_POOL_SIZE = int(os.getenv("SPOTIFY_POOL_SIZE", "20"))
+SPOTIFY_CONNECT_TIMEOUT = float(os.getenv("SPOTIFY_CONNECT_TIMEOUT", "3.05"))  # seconds
+SPOTIFY_READ_TIMEOUT = float(os.getenv("SPOTIFY_READ_TIMEOUT", "10"))  # seconds
+SPOTIFY_MAX_RETRIES = int(os.getenv("SPOTIFY_MAX_RETRIES", "3"))
+SPOTIFY_MAX_CONCURRENCY = int(os.getenv("SPOTIFY_MAX_CONCURRENCY", "8"))
+SPOTIFY_FANOUT_TIMEOUT = float(os.getenv("SPOTIFY_FANOUT_TIMEOUT", "5"))  # seconds per fanned-out call
+SPOTIFY_PLAYLIST_DEADLINE = float(os.getenv("SPOTIFY_PLAYLIST_DEADLINE", "8"))  # seconds for all playlist seeds
+SPOTIFY_BATCH_DEADLINE = float(os.getenv("SPOTIFY_BATCH_DEADLINE", "8"))  # seconds for all items of a batch lookup
+SPOTIFY_RATE_LIMIT = float(os.getenv("SPOTIFY_RATE_LIMIT", "10"))  # requests per second, shared by the process
+SPOTIFY_RATE_BURST = int(os.getenv("SPOTIFY_RATE_BURST", "20"))
+SPOTIFY_TOKEN_REFRESH_MARGIN = float(os.getenv("SPOTIFY_TOKEN_REFRESH_MARGIN", "300"))  # renew this long before expiry
+SPOTIFY_BREAKER_THRESHOLD = int(os.getenv("SPOTIFY_BREAKER_THRESHOLD", "5"))  # consecutive failures that open a circuit
+SPOTIFY_BREAKER_RESET_TIMEOUT = float(os.getenv("SPOTIFY_BREAKER_RESET_TIMEOUT", "30"))  # seconds before a trial call
+SPOTIFY_HEDGE_REQUESTS = os.getenv("SPOTIFY_HEDGE_REQUESTS", "true").lower() == "true"
+SPOTIFY_HEDGE_PERCENTILE = float(os.getenv("SPOTIFY_HEDGE_PERCENTILE", "0.95"))  # hedge GETs slower than this percentile
+
+# Spotify Cache Configuration (set a path to an empty string to keep a cache in memory only)
+SPOTIFY_ARTIST_CACHE_PATH = os.getenv("SPOTIFY_ARTIST_CACHE_PATH", ".cache/spotify_artist_ids.sqlite3")
+SPOTIFY_ARTIST_CACHE_TTL = int(os.getenv("SPOTIFY_ARTIST_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+SPOTIFY_RESPONSE_CACHE_SIZE = int(os.getenv("SPOTIFY_RESPONSE_CACHE_SIZE", "512"))  # entries
+SPOTIFY_CATALOG_PATH = os.getenv("SPOTIFY_CATALOG_PATH", "")  # local track search index; empty disables it
+
+# Tool memoization (identical tool calls answered without re-running the tool)
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "256"))  # entries per tool
+
+# Spotify Transport Configuration ("live", "record" or "replay")
+SPOTIFY_TRANSPORT = os.getenv("SPOTIFY_TRANSPORT", "live").lower()
+SPOTIFY_CASSETTE_PATH = os.getenv("SPOTIFY_CASSETTE_PATH", ".cache/spotify_cassette.json.gz")
+SPOTIFY_REPLAY_LATENCY = float(os.getenv("SPOTIFY_REPLAY_LATENCY", "0"))  # seconds added per replayed request
+SPOTIFY_REPLAY_JITTER = float(os.getenv("SPOTIFY_REPLAY_JITTER", "0"))  # extra random delay, up to this many seconds
+SPOTIFY_REPLAY_ERROR_RATE = float(os.getenv("SPOTIFY_REPLAY_ERROR_RATE", "0"))  # fraction of replayed requests that fail
+
+# Web Search Configuration (backend: "live", "record" or "replay")
+TAVILY_BACKEND = os.getenv("TAVILY_BACKEND", "live").lower()
+TAVILY_RECORDINGS_PATH = os.getenv("TAVILY_RECORDINGS_PATH", ".cache/tavily_recordings.json.gz")
+TAVILY_CACHE_SIZE = int(os.getenv("TAVILY_CACHE_SIZE", "512"))  # entries
+TAVILY_NEWS_TTL = int(os.getenv("TAVILY_NEWS_TTL", str(15 * 60)))  # seconds, for news-like queries
+TAVILY_EVERGREEN_TTL = int(os.getenv("TAVILY_EVERGREEN_TTL", str(24 * 3600)))  # seconds, for everything else
+
 def get_chat_model():
     """Get configured chat model for the agent."""
+    from langchain_openai import ChatOpenAI
+
     return ChatOpenAI(
-        model="gpt-4o-mini",
+        model=AGENT_MODEL,
         temperature=0.2,
         api_key=OPENAI_API_KEY,
     )
@@ -35,8 +86,9 @@ def validate_config():
         "OPENAI_API_KEY": OPENAI_API_KEY,
         "SPOTIFY_CLIENT_ID": SPOTIFY_CLIENT_ID,
         "SPOTIFY_CLIENT_SECRET": SPOTIFY_CLIENT_SECRET,
-        "TAVILY_API_KEY": TAVILY_API_KEY
     }
+    if TAVILY_BACKEND != "replay":  # Replay serves recorded searches without calling Tavily
+        required_vars["TAVILY_API_KEY"] = TAVILY_API_KEY
 
     missing_vars = [name for name, value in required_vars.items() if not value]
 
@@ -44,7 +96,3 @@ def validate_config():
         raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
     return True
-
-# Validate on import
-validate_config()
-print(f"Configuration loaded for project: {LANGSMITH_PROJECT}")
\ No newline at end of file
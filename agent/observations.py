@@ -0,0 +1,145 @@
+"""
+Compact, token-budgeted rendering of tool results for the agent scratchpad.
+
+Every tool result is appended to the scratchpad and resent on each later
+iteration, so a 50-track playlist stringified in full costs thousands of
+prompt tokens per step. The scratchpad instead shows the LLM what it needs
+to reason about: the error if any, the tool's formatted_summary, how many
+tracks came back and a few exemplars, cut to a token budget. The full
+result models are untouched and still reach analyze_query through the
+executor's intermediate steps. format_scratchpad builds the ReAct text
+scratchpad and format_tool_messages the tool-calling message history.
+
+Tokens are counted with tiktoken when it is installed and its encoding can
+be loaded, otherwise estimated at four characters per token.
+"""
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+
+from . import config
+from .track import Track
+
+_encoding = None
+_encoding_resolved = False
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """The tiktoken encoding for the agent's model, or None to estimate"""
+    global _encoding, _encoding_resolved
+    with _encoding_lock:
+        if not _encoding_resolved:
+            try:
+                import tiktoken
+
+                try:
+                    _encoding = tiktoken.encoding_for_model(config.AGENT_MODEL)
+                except KeyError:
+                    _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                # Not installed, or the encoding can't be downloaded
+                _encoding = None
+            _encoding_resolved = True
+        return _encoding
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text for the agent's model"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cut text to at most budget tokens, marking the cut with an ellipsis"""
+    if count_tokens(text) <= budget:
+        return text
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max(budget - 1, 0) * 4].rstrip() + "…"
+    return encoding.decode(encoding.encode(text)[:max(budget - 1, 0)]).rstrip() + "…"
+
+def _track_line(track: Track) -> str:
+    return f"{track.name} by {track.artist} (popularity {track.popularity})"
+
+def _model_parts(result: BaseModel, exemplars: int) -> Tuple[List[str], List[str]]:
+    """Header lines and exemplar lines for a tool result model"""
+    header = []
+    error = getattr(result, "error", None)
+    if error:
+        header.append(f"Error: {error}")
+    summary = getattr(result, "formatted_summary", None)
+    if summary:
+        header.append(summary)
+
+    examples = []
+    for field in type(result).model_fields:
+        value = getattr(result, field)
+        if isinstance(value, list) and value and isinstance(value[0], Track):
+            header.append(f"{len(value)} {field} returned")
+            examples.extend(_track_line(track) for track in value[:exemplars])
+    if not header:
+        header.append(str(result))
+    return header, examples
+
+def _search_parts(result: dict, exemplars: int) -> Tuple[List[str], List[str]]:
+    """Header lines and exemplar lines for a web search result"""
+    header = []
+    if result.get("error"):
+        header.append(f"Error: {result['error']}")
+    if result.get("answer"):
+        header.append(f"Answer: {result['answer']}")
+    results = result.get("results") or []
+    header.append(f"{len(results)} results")
+    examples = []
+    for item in results[:exemplars]:
+        content = " ".join(str(item.get("content", "")).split())
+        examples.append(f"{item.get('title', '')} ({item.get('url', '')}): {content[:300]}")
+    return header, examples
+
+def render_observation(observation: Any, budget: Optional[int] = None,
+                       exemplars: Optional[int] = None) -> str:
+    """
+    Compact text of a tool result for the scratchpad
+
+    Args:
+        observation: Tool result (result model, web search dict or anything else)
+        budget: Token budget (defaults to OBSERVATION_TOKEN_BUDGET)
+        exemplars: Example tracks or search results to include (defaults to OBSERVATION_EXEMPLARS)
+    """
+    budget = config.OBSERVATION_TOKEN_BUDGET if budget is None else budget
+    exemplars = config.OBSERVATION_EXEMPLARS if exemplars is None else exemplars
+
+    if isinstance(observation, BaseModel):
+        header, examples = _model_parts(observation, exemplars)
+    elif isinstance(observation, dict) and ("results" in observation or "answer" in observation):
+        header, examples = _search_parts(observation, exemplars)
+    else:
+        return truncate_to_tokens(str(observation), budget)
+
+    # Drop exemplars from the end before cutting into the summary itself
+    while True:
+        lines = header + ([f"Examples: {'; '.join(examples)}"] if examples else [])
+        text = "\n".join(lines)
+        if not examples or count_tokens(text) <= budget:
+            break
+        examples.pop()
+    return truncate_to_tokens(text, budget)
+
+def format_scratchpad(intermediate_steps: Sequence[Tuple[Any, Any]],
+                      render: Callable[[Any], str] = render_observation,
+                      observation_prefix: str = "Observation: ",
+                      llm_prefix: str = "Thought: ") -> str:
+    """ReAct scratchpad like langchain's format_log_to_str, rendering observations with render"""
+    thoughts = ""
+    for action, observation in intermediate_steps:
+        thoughts += action.log
+        thoughts += f"\n{observation_prefix}{render(observation)}\n{llm_prefix}"
+    return thoughts
+
+def format_tool_messages(intermediate_steps: Sequence[Tuple[Any, Any]],
+                         render: Callable[[Any], str] = render_observation) -> List[BaseMessage]:
+    """Tool-calling scratchpad like langchain's format_to_tool_messages, rendering observations with render"""
+    return format_to_tool_messages([(action, render(observation)) for action, observation in intermediate_steps])
@@ -0,0 +1,157 @@
+"""
+Pool of pre-built SpotifyMusicAgents.
+
+Building an agent creates the prompt, a ChatOpenAI client with its own HTTP
+connection pool, and the AgentExecutor. Doing that for every request is
+wasted work, so the API and the evaluation entry point check agents out of
+a fixed-size pool instead. Each agent serves one caller at a time. Agents
+are built on demand up to the pool size, or all at once by warm_up() at
+startup.
+"""
+import asyncio
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from .music_agent import SpotifyMusicAgent
+from . import config
+
+class AgentPool:
+    """Thread-safe, fixed-size pool of reusable agents"""
+
+    def __init__(self, size: int = 4, mode: Optional[str] = None,
+                 factory: Optional[Callable[[], SpotifyMusicAgent]] = None,
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            size: Most agents built (and so most concurrent runs)
+            mode: Agent mode for every agent (defaults to AGENT_MODE)
+            factory: Builds one agent (defaults to SpotifyMusicAgent(mode))
+            timeout: Seconds to wait for a free agent before giving up (None waits forever)
+        """
+        if size < 1:
+            raise ValueError("Agent pool size must be at least 1")
+        self.size = size
+        self.mode = mode
+        self.timeout = timeout
+        self._factory = factory or (lambda: SpotifyMusicAgent(mode=mode))
+        self._idle: "queue.Queue[SpotifyMusicAgent]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._built = 0
+        self._build_seconds = 0.0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    def _build(self) -> SpotifyMusicAgent:
+        started = time.perf_counter()
+        try:
+            agent = self._factory()
+        except BaseException:
+            with self._lock:
+                self._built -= 1  # Give the slot back
+            raise
+        with self._lock:
+            self._build_seconds += time.perf_counter() - started
+        return agent
+
+    def warm_up(self, count: Optional[int] = None) -> float:
+        """Build agents until count (default: the pool size) exist; returns seconds spent"""
+        started = time.perf_counter()
+        target = min(self.size if count is None else count, self.size)
+        while True:
+            with self._lock:
+                if self._built >= target:
+                    break
+                self._built += 1
+            self._idle.put(self._build())
+        return time.perf_counter() - started
+
+    def acquire(self, timeout: Optional[float] = None) -> SpotifyMusicAgent:
+        """Check an agent out, building one if the pool is not full yet"""
+        try:
+            agent = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                build = self._built < self.size
+                if build:
+                    self._built += 1
+            if build:
+                agent = self._build()
+            else:
+                started = time.perf_counter()
+                timeout = self.timeout if timeout is None else timeout
+                try:
+                    agent = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No agent became free within {timeout}s (pool size {self.size})")
+                with self._lock:
+                    self._waits += 1
+                    self._wait_seconds += time.perf_counter() - started
+        with self._lock:
+            self._checkouts += 1
+        return agent
+
+    def release(self, agent: SpotifyMusicAgent):
+        """Return an agent to the pool"""
+        self._idle.put(agent)
+
+    def _release_abandoned(self, checkout: "asyncio.Future[SpotifyMusicAgent]"):
+        """Return the agent of a checkout whose caller was cancelled"""
+        if not checkout.cancelled() and checkout.exception() is None:
+            self.release(checkout.result())
+
+    @contextmanager
+    def agent(self, timeout: Optional[float] = None) -> Iterator[SpotifyMusicAgent]:
+        """Use an agent for the duration of a with block"""
+        agent = self.acquire(timeout)
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    @asynccontextmanager
+    async def aagent(self, timeout: Optional[float] = None) -> AsyncIterator[SpotifyMusicAgent]:
+        """agent() for coroutines: waiting for a free agent does not block the event loop"""
+        try:
+            agent = self._idle.get_nowait()
+            with self._lock:
+                self._checkouts += 1
+        except queue.Empty:
+            # Shielded so a cancelled caller doesn't strand the agent the thread checks out
+            checkout = asyncio.ensure_future(asyncio.to_thread(self.acquire, timeout))
+            try:
+                agent = await asyncio.shield(checkout)
+            except asyncio.CancelledError:
+                checkout.add_done_callback(self._release_abandoned)
+                raise
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "mode": self.mode or config.AGENT_MODE,
+                "built": self._built,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "mean_wait_ms": self._wait_seconds / self._waits * 1000 if self._waits else 0.0,
+                "mean_build_ms": self._build_seconds / self._built * 1000 if self._built else 0.0,
+            }
+
+_agent_pool: Optional[AgentPool] = None
+_agent_pool_lock = threading.Lock()
+
+def get_agent_pool() -> AgentPool:
+    """Get the process-wide agent pool, sized by AGENT_POOL_SIZE"""
+    global _agent_pool
+    with _agent_pool_lock:
+        if _agent_pool is None:
+            _agent_pool = AgentPool(size=config.AGENT_POOL_SIZE, timeout=config.AGENT_POOL_TIMEOUT)
+        return _agent_pool
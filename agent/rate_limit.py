@@ -0,0 +1,174 @@
+"""
+Client-side rate limiting for Spotify API traffic.
+
+RequestScheduler is a token bucket shared across the process. Callers wait
+in priority lanes: interactive /chat traffic is always served before
+evaluation (batch) traffic. When Spotify answers 429, the scheduler pauses
+every lane for the Retry-After period instead of letting each request
+fail or retry on its own.
+
+The lane for the current call chain is carried in a context variable, so it
+is set once at the entry point (see request_priority) rather than threaded
+through every tool and client method.
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITY_LANES = (INTERACTIVE, BATCH)  # Highest priority first
+
+_current_priority: ContextVar[str] = ContextVar("spotify_request_priority", default=INTERACTIVE)
+
+@contextmanager
+def request_priority(lane: str) -> Iterator[None]:
+    """Run the enclosed Spotify calls in the given priority lane"""
+    if lane not in PRIORITY_LANES:
+        raise ValueError(f"Unknown priority lane: {lane}")
+    token = _current_priority.set(lane)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Parse a Retry-After header given in seconds"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+class RequestScheduler:
+    """Token-bucket limiter with priority lanes and Retry-After backoff"""
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, max_retries: int = 3,
+                 poll_interval: float = 0.01):
+        """
+        Args:
+            rate: Sustained requests per second
+            burst: Bucket capacity (requests allowed back-to-back)
+            max_retries: Times a request is retried after a 429
+            poll_interval: Re-check delay for a lane held back by a higher one
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = {lane: 0 for lane in PRIORITY_LANES}
+        self._granted = {lane: 0 for lane in PRIORITY_LANES}
+        self._throttle_seconds = {lane: 0.0 for lane in PRIORITY_LANES}
+        self._rate_limited = 0
+        self._retry_after_seconds = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _try_take(self, lane: str) -> float:
+        """Take a token for lane, or return how long to wait; caller holds the lock"""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        higher_lanes = PRIORITY_LANES[:PRIORITY_LANES.index(lane)]
+        if any(self._waiting[higher] for higher in higher_lanes):
+            return self.poll_interval
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _record(self, lane: str, started: float):
+        self._granted[lane] += 1
+        self._throttle_seconds[lane] += time.monotonic() - started
+
+    def acquire(self, lane: Optional[str] = None):
+        """Block until the current (or given) lane may send a request"""
+        lane = lane or current_priority()
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                delay = self._try_take(lane)
+                while delay > 0:
+                    self._cond.wait(delay)
+                    delay = self._try_take(lane)
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+            self._record(lane, started)
+
+    async def acquire_async(self, lane: Optional[str] = None):
+        """Wait, without blocking the event loop, until the lane may send a request"""
+        lane = lane or current_priority()
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[lane] += 1
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_take(lane)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            with self._cond:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+        with self._cond:
+            self._record(lane, started)
+
+    def on_rate_limited(self, retry_after: float):
+        """Pause all lanes after a 429 for the Retry-After period"""
+        with self._cond:
+            self._rate_limited += 1
+            self._retry_after_seconds += retry_after
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens_available": round(self._tokens, 2),
+                "paused_for": max(self._blocked_until - time.monotonic(), 0.0),
+                "queue_depth": dict(self._waiting),
+                "requests": dict(self._granted),
+                "throttle_seconds": {lane: round(seconds, 3) for lane, seconds in self._throttle_seconds.items()},
+                "rate_limited_responses": self._rate_limited,
+                "retry_after_seconds": self._retry_after_seconds,
+            }
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+def get_default_scheduler() -> RequestScheduler:
+    """Get the process-wide scheduler shared by every Spotify client"""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+def configure_default_scheduler(rate: float, burst: int, max_retries: int = 3) -> RequestScheduler:
+    """Set the limits of the process-wide scheduler, in place"""
+    scheduler = get_default_scheduler()
+    with scheduler._cond:
+        scheduler.rate = rate
+        scheduler.burst = burst
+        scheduler.max_retries = max_retries
+        scheduler._tokens = min(scheduler._tokens, float(burst))
+    return scheduler
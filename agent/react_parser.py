@@ -0,0 +1,47 @@
+"""
+ReAct output parsing for tools that take structured input.
+
+ReAct gives every tool a single string Action Input. That works for the
+one-argument tools, but batch_music_lookup takes several lists, so its
+input is written as a JSON object. This parser decodes a JSON object Action
+Input into keyword arguments whenever every key names one of the tool's
+arguments. Anything else, such as create_smart_playlist's JSON string
+argument, is passed through unchanged.
+"""
+import json
+from typing import Dict, FrozenSet, Sequence, Union
+
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.tools import BaseTool
+
+class ReActStructuredInputOutputParser(ReActSingleInputOutputParser):
+    """ReActSingleInputOutputParser that decodes JSON object inputs for multi-argument tools"""
+
+    tool_args: Dict[str, FrozenSet[str]] = {}
+
+    @classmethod
+    def from_tools(cls, tools: Sequence[BaseTool]) -> "ReActStructuredInputOutputParser":
+        return cls(tool_args={tool.name: frozenset(tool.args) for tool in tools})
+
+    def parse(self, text: str) -> Union[AgentAction, AgentFinish]:
+        result = super().parse(text)
+        if not isinstance(result, AgentAction) or not isinstance(result.tool_input, str):
+            return result
+
+        tool_input = result.tool_input.strip()
+        if not tool_input.startswith("{"):
+            return result
+        try:
+            arguments = json.loads(tool_input)
+        except ValueError:
+            return result
+
+        expected = self.tool_args.get(result.tool, frozenset())
+        if isinstance(arguments, dict) and arguments and set(arguments) <= expected:
+            return AgentAction(result.tool, arguments, result.log)
+        return result
+
+    @property
+    def _type(self) -> str:
+        return "react-structured-input"
@@ -0,0 +1,361 @@
+"""
+Tail-latency protection for Spotify calls.
+
+Each endpoint template (/artists/{id}/top-tracks, /search, ...) gets its
+own circuit breaker and latency tracker. A breaker opens after a run of
+consecutive failures and rejects calls immediately until a cool-down has
+passed, then lets a single trial call through (half-open) to decide whether
+to close again.
+
+Once an endpoint has enough latency samples, a GET that has not answered
+within that endpoint's p95 gets a duplicate (hedge) request, and whichever
+answers first wins. call() runs blocking callables on a thread pool and
+acall() coroutines on the event loop; both share the same breakers and
+latency windows.
+"""
+import asyncio
+import contextvars
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_ID_SEGMENT = re.compile(r"^/(artists|albums|tracks|playlists|shows|episodes|users)/[^/]+")
+
+def endpoint_template(endpoint: str) -> str:
+    """Collapse resource IDs so all calls to the same endpoint share state"""
+    return _ID_SEGMENT.sub(r"/\1/{id}", endpoint)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before allowing a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def precheck(self) -> bool:
+        """Like allow(), but without claiming the half-open trial; a rejection is counted"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            cooled_down = time.monotonic() - self._opened_at >= self.reset_timeout
+            if (self._state == OPEN and cooled_down) or (self._state == HALF_OPEN and not self._trial_in_flight):
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_abandoned(self):
+        """The call was cancelled before it finished; it proves nothing either way"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._times_opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+            }
+
+class LatencyTracker:
+    """Sliding window of recent latencies for one endpoint"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+class _EndpointStats:
+    __slots__ = ("calls", "failures", "hedged", "hedge_wins")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+class ResilientCaller:
+    """Run upstream calls behind per-endpoint circuit breakers, hedging slow GETs"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 hedge: bool = True, hedge_percentile: float = 0.95, hedge_min_samples: int = 20,
+                 hedge_min_delay: float = 0.05, max_workers: int = 16):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open an endpoint's breaker
+            reset_timeout: Seconds a breaker stays open before a trial call
+            hedge: Whether to send duplicate requests for slow GETs
+            hedge_percentile: Latency percentile after which a hedge is sent
+            hedge_min_samples: Samples an endpoint needs before it is hedged
+            hedge_min_delay: Never hedge sooner than this many seconds
+            max_workers: Threads available to primary and hedge requests
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._stats: Dict[str, _EndpointStats] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spotify-hedge") if hedge else None
+
+    def _endpoint_state(self, template: str):
+        with self._lock:
+            if template not in self._breakers:
+                self._breakers[template] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._latencies[template] = LatencyTracker()
+                self._stats[template] = _EndpointStats()
+            return self._breakers[template], self._latencies[template], self._stats[template]
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging a call to endpoint, or None to not hedge"""
+        if not self.hedge:
+            return None
+        _, latencies, _ = self._endpoint_state(endpoint_template(endpoint))
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        return max(latencies.percentile(self.hedge_percentile), self.hedge_min_delay)
+
+    def check(self, endpoint: str):
+        """
+        Raise CircuitOpenError if a call to endpoint would be rejected now
+
+        Lets callers skip the work of preparing a call (e.g. taking a
+        rate-limit token) that the breaker would refuse anyway.
+        """
+        template = endpoint_template(endpoint)
+        breaker, _, _ = self._endpoint_state(template)
+        if not breaker.precheck():
+            raise CircuitOpenError(f"Circuit open for {template}")
+
+    def call(self, endpoint: str, fn: Callable[[], T],
+             is_failure: Callable[[T], bool] = lambda result: False,
+             hedge_fn: Optional[Callable[[], T]] = None) -> T:
+        """
+        Call fn for endpoint through its breaker, hedging it if it is slow
+
+        fn must be safe to run twice (an idempotent GET). The duplicate runs
+        hedge_fn when given (e.g. fn plus taking a rate-limit token).
+        Exceptions and results for which is_failure returns True count as
+        failures.
+        """
+        template = endpoint_template(endpoint)
+        breaker, latencies, stats = self._endpoint_state(template)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {template}")
+
+        delay = self.hedge_delay(endpoint)
+        started = time.monotonic()
+        try:
+            if delay is None:
+                result = fn()
+            else:
+                result = self._hedged(fn, hedge_fn or fn, delay, stats)
+        except BaseException:
+            self._record(breaker, stats, failed=True)
+            raise
+
+        failed = is_failure(result)
+        if not failed:
+            latencies.record(time.monotonic() - started)
+        self._record(breaker, stats, failed=failed)
+        return result
+
+    async def acall(self, endpoint: str, fn: Callable[[], Awaitable[T]],
+                    is_failure: Callable[[T], bool] = lambda result: False,
+                    hedge_fn: Optional[Callable[[], Awaitable[T]]] = None) -> T:
+        """call() for coroutines: fn and hedge_fn return awaitables and run as tasks"""
+        template = endpoint_template(endpoint)
+        breaker, latencies, stats = self._endpoint_state(template)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {template}")
+
+        delay = self.hedge_delay(endpoint)
+        started = time.monotonic()
+        try:
+            if delay is None:
+                result = await fn()
+            else:
+                result = await self._ahedged(fn, hedge_fn or fn, delay, stats)
+        except asyncio.CancelledError:
+            breaker.record_abandoned()
+            raise
+        except BaseException:
+            self._record(breaker, stats, failed=True)
+            raise
+
+        failed = is_failure(result)
+        if not failed:
+            latencies.record(time.monotonic() - started)
+        self._record(breaker, stats, failed=failed)
+        return result
+
+    def _record(self, breaker: CircuitBreaker, stats: _EndpointStats, failed: bool):
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        with self._lock:
+            stats.calls += 1
+            stats.failures += failed
+
+    def _hedged(self, fn: Callable[[], T], hedge_fn: Callable[[], T], delay: float, stats: _EndpointStats) -> T:
+        # Both requests run in a copy of the caller's context (e.g. its priority lane)
+        primary: Future = self._executor.submit(contextvars.copy_context().run, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge: Future = self._executor.submit(contextvars.copy_context().run, hedge_fn)
+        with self._lock:
+            stats.hedged += 1
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            stats.hedge_wins += 1
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _ahedged(self, fn: Callable[[], Awaitable[T]], hedge_fn: Callable[[], Awaitable[T]],
+                       delay: float, stats: _EndpointStats) -> T:
+        primary = asyncio.ensure_future(fn())
+        hedge: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            hedge = asyncio.ensure_future(hedge_fn())
+            with self._lock:
+                stats.hedged += 1
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            with self._lock:
+                                stats.hedge_wins += 1
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            # The loser (or both, if we were cancelled) is not needed any more
+            for future in (primary, hedge):
+                if future is not None and not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            templates = list(self._breakers)
+        endpoints = {}
+        for template in templates:
+            breaker, latencies, stats = self._endpoint_state(template)
+            p50 = latencies.percentile(0.5)
+            p95 = latencies.percentile(0.95)
+            p99 = latencies.percentile(0.99)
+            with self._lock:
+                endpoints[template] = {
+                    **breaker.stats(),
+                    "calls": stats.calls,
+                    "failures": stats.failures,
+                    "hedged": stats.hedged,
+                    "hedge_wins": stats.hedge_wins,
+                    "hedge_win_rate": stats.hedge_wins / stats.hedged if stats.hedged else 0.0,
+                    "latency_ms": {
+                        "p50": p50 * 1000 if p50 is not None else None,
+                        "p95": p95 * 1000 if p95 is not None else None,
+                        "p99": p99 * 1000 if p99 is not None else None,
+                    },
+                }
+        return {"hedging": self.hedge, "endpoints": endpoints}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -4,36 +4,69 @@ Spotify Tools for Music Concierge Agent
 Professional music tools with structured outputs using Pydantic models.
 All tools follow LangChain best practices for reliable agent integration.
 """
+import asyncio
 import os
 import json
-import random
-from typing import List, Optional
+import weakref
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
 from langchain_core.tools import tool
-from langchain_tavily import TavilySearch
 from pydantic import BaseModel, Field
-from .client import WorkingSpotifyClient
+from .client import WorkingSpotifyClient, SpotifySessionPool
+from .async_client import AsyncSpotifyClient
+from .catalog import TrackCatalog
+from .resilience import ResilientCaller
+from .cassette import Cassette, RecordingTransport, ReplayTransport
+from .track import Track
+from .cache import ArtistIdCache, ResponseCache
+from .rate_limit import configure_default_scheduler
+from .concurrency import fan_out, afan_out
+from .tool_cache import memoize_tool, configure_tool_memoizer, normalize_json_argument, get_tool_memoizer
+from .web_search import get_web_search_tool
+from .playlist_engine import rank_playlist, diversity_score as playlist_diversity
 from . import config
 
-# Pydantic models for structured outputs
-class SpotifyTrackData(BaseModel):
-    """Individual track information."""
-    id: str = Field(description="Spotify track ID")
-    name: str = Field(description="Song name")
-    artist: str = Field(description="Artist name(s)")
-    album: str = Field(description="Album name")
-    popularity: int = Field(description="Popularity score (0-100)")
-    duration: str = Field(description="Duration in MM:SS format")
-    spotify_url: str = Field(description="Spotify URL")
-    preview_url: Optional[str] = Field(description="Preview URL if available")
-    album_image_url: Optional[str] = Field(description="Album artwork URL")
-    formatted_summary: str = Field(description="Human-readable summary")
-    error: Optional[str] = None
+configure_tool_memoizer(maxsize=config.TOOL_CACHE_SIZE, enabled=config.TOOL_CACHE_ENABLED)
+
+# Seconds an identical tool call is answered from the tool cache
+TOOL_CACHE_TTLS = {
+    "search_tracks": 3600,
+    "get_artist_top_songs": 6 * 3600,
+    "get_similar_songs": 6 * 3600,
+    "get_genre_songs": 3600,
+    "create_smart_playlist": 3600,
+    "batch_music_lookup": 3600,
+}
 
+def playlist_seed(arguments) -> Optional[int]:
+    """Seed inside a create_smart_playlist JSON query, if any"""
+    try:
+        return json.loads(arguments["query"]).get("seed")
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+def batch_seed(arguments) -> Optional[int]:
+    """Cache seed for batch_music_lookup: lookups without similar or genre items are deterministic"""
+    if arguments.get("similar") or arguments.get("genres"):
+        return arguments.get("seed")
+    return 0
+
+# Seed affinity used when ranking smart playlist candidates
+ARTIST_SEED_AFFINITY = 1.0
+GENRE_SEED_AFFINITY = 0.6
+
+# Most artists, genres and search terms resolved by one batch lookup, and
+# songs fetched for each of them
+MAX_BATCH_ITEMS = 10
+BATCH_SONGS_PER_ITEM = 10
+
+# Pydantic models for structured outputs. Tracks are held as compact Track
+# objects and only become dicts when a result is dumped at the edge.
 class TrackSearchResult(BaseModel):
     """Search results for tracks."""
     query: str = Field(description="Original search query")
     total_results: int = Field(description="Number of tracks found")
-    tracks: List[SpotifyTrackData] = Field(description="List of tracks")
+    tracks: List[Track] = Field(description="List of tracks")
     formatted_summary: str = Field(description="Human-readable summary")
     error: Optional[str] = None
 
@@ -41,7 +74,7 @@ class ArtistTopSongsResult(BaseModel):
     """Top songs by an artist."""
     artist_name: str = Field(description="Artist name searched")
     total_songs: int = Field(description="Number of songs found")
-    songs: List[SpotifyTrackData] = Field(description="List of top songs")
+    songs: List[Track] = Field(description="List of top songs")
     formatted_summary: str = Field(description="Human-readable summary")
     error: Optional[str] = None
 
@@ -50,10 +83,11 @@ class SmartPlaylistResult(BaseModel):
     playlist_name: str = Field(description="Generated playlist name")
     description: str = Field(description="Playlist description")
     total_songs: int = Field(description="Number of songs in playlist")
-    songs: List[SpotifyTrackData] = Field(description="List of songs")
+    songs: List[Track] = Field(description="List of songs")
     seed_artists: List[str] = Field(description="Artists used as seeds")
     seed_genres: List[str] = Field(description="Genres used as seeds")
     diversity_score: float = Field(description="Playlist diversity score")
+    missing_seeds: List[str] = Field(default_factory=list, description="Seeds that failed or missed the deadline")
     formatted_summary: str = Field(description="Human-readable summary")
     error: Optional[str] = None
 
@@ -61,41 +95,341 @@ class GenreSongsResult(BaseModel):
     """Songs from a specific genre."""
     genre: str = Field(description="Genre searched")
     total_songs: int = Field(description="Number of songs found")
-    songs: List[SpotifyTrackData] = Field(description="List of genre songs")
+    songs: List[Track] = Field(description="List of genre songs")
+    formatted_summary: str = Field(description="Human-readable summary")
+    error: Optional[str] = None
+
+class BatchLookupResult(BaseModel):
+    """Merged songs for several artists, genres and search terms."""
+    artists: List[str] = Field(description="Artists looked up")
+    genres: List[str] = Field(description="Genres looked up")
+    search_terms: List[str] = Field(description="Search terms looked up")
+    total_songs: int = Field(description="Number of unique songs found")
+    songs: List[Track] = Field(description="Merged, deduplicated songs")
+    songs_per_item: Dict[str, int] = Field(default_factory=dict, description="Songs each item contributed")
+    missing: List[str] = Field(default_factory=list, description="Items that failed, found nothing or missed the deadline")
     formatted_summary: str = Field(description="Human-readable summary")
     error: Optional[str] = None
 
 # Initialize Spotify client
 _spotify_client = None
 
+def get_tool_cache_stats():
+    """Per-tool memoization hit ratios"""
+    return get_tool_memoizer().stats()
+
+def build_spotify_transport():
+    """Build the HTTP transport selected by SPOTIFY_TRANSPORT (None means the live pool)"""
+    mode = config.SPOTIFY_TRANSPORT
+    if mode == "live":
+        return None
+    if mode == "record":
+        pool = SpotifySessionPool(pool_size=config.SPOTIFY_POOL_SIZE, max_retries=config.SPOTIFY_MAX_RETRIES)
+        return RecordingTransport(pool, Cassette(config.SPOTIFY_CASSETTE_PATH))
+    if mode == "replay":
+        if not os.path.exists(config.SPOTIFY_CASSETTE_PATH):
+            raise ValueError(f"Spotify cassette not found: {config.SPOTIFY_CASSETTE_PATH}")
+        return ReplayTransport(
+            Cassette(config.SPOTIFY_CASSETTE_PATH),
+            latency=config.SPOTIFY_REPLAY_LATENCY,
+            jitter=config.SPOTIFY_REPLAY_JITTER,
+            error_rate=config.SPOTIFY_REPLAY_ERROR_RATE
+        )
+    raise ValueError(f"Unknown SPOTIFY_TRANSPORT: {mode} (expected live, record or replay)")
+
 def get_spotify_client() -> WorkingSpotifyClient:
     """Get or create Spotify client instance."""
     global _spotify_client
     if _spotify_client is None:
         _spotify_client = WorkingSpotifyClient(
             config.SPOTIFY_CLIENT_ID,
-            config.SPOTIFY_CLIENT_SECRET
+            config.SPOTIFY_CLIENT_SECRET,
+            pool_size=config.SPOTIFY_POOL_SIZE,
+            timeout=(config.SPOTIFY_CONNECT_TIMEOUT, config.SPOTIFY_READ_TIMEOUT),
+            max_retries=config.SPOTIFY_MAX_RETRIES,
+            max_concurrency=config.SPOTIFY_MAX_CONCURRENCY,
+            fanout_timeout=config.SPOTIFY_FANOUT_TIMEOUT,
+            artist_cache=ArtistIdCache(
+                path=config.SPOTIFY_ARTIST_CACHE_PATH or None,
+                ttl=config.SPOTIFY_ARTIST_CACHE_TTL
+            ),
+            response_cache=ResponseCache(maxsize=config.SPOTIFY_RESPONSE_CACHE_SIZE),
+            token_refresh_margin=config.SPOTIFY_TOKEN_REFRESH_MARGIN,
+            scheduler=configure_default_scheduler(
+                rate=config.SPOTIFY_RATE_LIMIT,
+                burst=config.SPOTIFY_RATE_BURST,
+                max_retries=config.SPOTIFY_MAX_RETRIES
+            ),
+            http=build_spotify_transport(),
+            catalog=TrackCatalog(config.SPOTIFY_CATALOG_PATH) if config.SPOTIFY_CATALOG_PATH else None,
+            resilience=ResilientCaller(
+                failure_threshold=config.SPOTIFY_BREAKER_THRESHOLD,
+                reset_timeout=config.SPOTIFY_BREAKER_RESET_TIMEOUT,
+                hedge=config.SPOTIFY_HEDGE_REQUESTS,
+                hedge_percentile=config.SPOTIFY_HEDGE_PERCENTILE,
+                max_workers=config.SPOTIFY_POOL_SIZE
+            )
         )
     return _spotify_client
 
-def _format_track_data(track_dict: dict) -> SpotifyTrackData:
-    """Convert track dictionary to SpotifyTrackData model."""
-    formatted_summary = f"{track_dict['name']} by {track_dict['artist']} | {track_dict['album']} | Popularity: {track_dict['popularity']}/100"
-
-    return SpotifyTrackData(
-        id=track_dict['id'],
-        name=track_dict['name'],
-        artist=track_dict['artist'],
-        album=track_dict['album'],
-        popularity=track_dict['popularity'],
-        duration=track_dict['duration'],
-        spotify_url=track_dict['spotify_url'],
-        preview_url=track_dict.get('preview_url'),
-        album_image_url=track_dict.get('album_image_url'),
+# Async clients by event loop; a client goes away with its loop
+_async_spotify_clients = weakref.WeakKeyDictionary()
+
+def get_async_spotify_client() -> AsyncSpotifyClient:
+    """
+    Get or create the async Spotify client for the running event loop.
+
+    httpx.AsyncClient connections belong to the loop that opened them, so
+    each loop gets its own client. All of them share the sync client's
+    token manager, artist/response caches, catalog, circuit breakers and
+    rate limiter. The sync client is built here
+    if it doesn't exist yet, which blocks the loop; servers should build it
+    at startup (the API does).
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_spotify_clients.get(loop)
+    if client is None:
+        spotify = get_spotify_client()
+        client = AsyncSpotifyClient(
+            config.SPOTIFY_CLIENT_ID,
+            config.SPOTIFY_CLIENT_SECRET,
+            pool_size=config.SPOTIFY_POOL_SIZE,
+            timeout=(config.SPOTIFY_CONNECT_TIMEOUT, config.SPOTIFY_READ_TIMEOUT),
+            max_retries=config.SPOTIFY_MAX_RETRIES,
+            max_concurrency=config.SPOTIFY_MAX_CONCURRENCY,
+            fanout_timeout=config.SPOTIFY_FANOUT_TIMEOUT,
+            artist_cache=spotify.artist_cache,
+            response_cache=spotify.response_cache,
+            scheduler=spotify.scheduler,
+            token_manager=spotify.token_manager,
+            catalog=spotify.catalog,
+            resilience=spotify.resilience
+        )
+        _async_spotify_clients[loop] = client
+    return client
+
+def get_async_spotify_stats() -> Optional[Dict[str, Any]]:
+    """
+    Connection pool and coalescing stats of the running loop's async client
+
+    None when the loop has no client yet. Caches, tokens, rate limiting and
+    resilience are shared with the sync client and reported there.
+    """
+    client = _async_spotify_clients.get(asyncio.get_running_loop())
+    if client is None:
+        return None
+    return {
+        "pool": client.get_pool_stats(),
+        "coalescing": client.get_coalescing_stats(),
+    }
+
+async def close_async_spotify_client():
+    """Close the running event loop's async Spotify client, if it has one"""
+    client = _async_spotify_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+# Result builders shared by the sync and coroutine implementations of each tool
+
+def _track_search_result(query: str, tracks: List[Track]) -> TrackSearchResult:
+    if not tracks:
+        return TrackSearchResult(
+            query=query,
+            total_results=0,
+            tracks=[],
+            formatted_summary=f"No tracks found for query: {query}",
+            error="No results found"
+        )
+
+    formatted_summary = f"Found {len(tracks)} tracks for '{query}'"
+    if tracks:
+        top_track = tracks[0]
+        formatted_summary += f" | Top result: {top_track.name} by {top_track.artist}"
+
+    return TrackSearchResult(
+        query=query,
+        total_results=len(tracks),
+        tracks=tracks,
+        formatted_summary=formatted_summary
+    )
+
+def _track_search_error(query: str, e: Exception) -> TrackSearchResult:
+    return TrackSearchResult(
+        query=query,
+        total_results=0,
+        tracks=[],
+        formatted_summary=f"Search failed for '{query}': {str(e)}",
+        error=str(e)
+    )
+
+def _top_songs_result(artist_name: str, songs: List[Track]) -> ArtistTopSongsResult:
+    if not songs:
+        return ArtistTopSongsResult(
+            artist_name=artist_name,
+            total_songs=0,
+            songs=[],
+            formatted_summary=f"No top songs found for {artist_name}",
+            error="Artist not found"
+        )
+
+    formatted_summary = f"{artist_name} top {len(songs)} songs"
+    if songs:
+        avg_popularity = sum(song.popularity for song in songs) / len(songs)
+        formatted_summary += f" | Avg popularity: {avg_popularity:.1f}/100"
+
+    return ArtistTopSongsResult(
+        artist_name=artist_name,
+        total_songs=len(songs),
+        songs=songs,
         formatted_summary=formatted_summary
     )
 
+def _top_songs_error(artist_name: str, e: Exception) -> ArtistTopSongsResult:
+    return ArtistTopSongsResult(
+        artist_name=artist_name,
+        total_songs=0,
+        songs=[],
+        formatted_summary=f"Failed to get top songs for {artist_name}: {str(e)}",
+        error=str(e)
+    )
+
+def _similar_songs_result(artist_name: str, songs: List[Track]) -> ArtistTopSongsResult:
+    if not songs:
+        return ArtistTopSongsResult(
+            artist_name=artist_name,
+            total_songs=0,
+            songs=[],
+            formatted_summary=f"No similar songs found for {artist_name}",
+            error="No similar artists found"
+        )
+
+    # Get unique artists for diversity metric
+    unique_artists = set(song.primary_artist for song in songs)
+    diversity_score = len(unique_artists) / len(songs) if songs else 0
+
+    formatted_summary = f"Similar to {artist_name}: {len(songs)} songs from {len(unique_artists)} artists | Diversity: {diversity_score:.2f}"
+
+    return ArtistTopSongsResult(
+        artist_name=f"Similar to {artist_name}",
+        total_songs=len(songs),
+        songs=songs,
+        formatted_summary=formatted_summary
+    )
+
+def _similar_songs_error(artist_name: str, e: Exception) -> ArtistTopSongsResult:
+    return ArtistTopSongsResult(
+        artist_name=artist_name,
+        total_songs=0,
+        songs=[],
+        formatted_summary=f"Failed to get similar songs for {artist_name}: {str(e)}",
+        error=str(e)
+    )
+
+def _genre_songs_result(genre: str, songs: List[Track]) -> GenreSongsResult:
+    if not songs:
+        return GenreSongsResult(
+            genre=genre,
+            total_songs=0,
+            songs=[],
+            formatted_summary=f"No songs found for genre: {genre}",
+            error="Genre not found"
+        )
+
+    if songs:
+        avg_popularity = sum(song.popularity for song in songs) / len(songs)
+        unique_artists = set(song.primary_artist for song in songs)
+        formatted_summary = f"{genre.title()} genre: {len(songs)} songs from {len(unique_artists)} artists | Avg popularity: {avg_popularity:.1f}/100"
+    else:
+        formatted_summary = f"No valid {genre} songs found"
+
+    return GenreSongsResult(
+        genre=genre,
+        total_songs=len(songs),
+        songs=songs,
+        formatted_summary=formatted_summary
+    )
+
+def _genre_songs_error(genre: str, e: Exception) -> GenreSongsResult:
+    return GenreSongsResult(
+        genre=genre,
+        total_songs=0,
+        songs=[],
+        formatted_summary=f"Failed to get {genre} songs: {str(e)}",
+        error=str(e)
+    )
+
+def _playlist_seeds(data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(kind, name) for every seed fetched: up to 3 artists and 2 genres"""
+    seeds = [("artist", artist) for artist in data.get("seed_artists", [])[:3]]
+    seeds += [("genre", genre) for genre in data.get("seed_genres", [])[:2]]
+    return seeds
+
+def _playlist_result(data: Dict[str, Any], seeds: List[Tuple[str, str]],
+                     results: List[Optional[List[Track]]]) -> SmartPlaylistResult:
+    """Rank the fetched seed tracks into a playlist; seeds that came back None are skipped"""
+    playlist_name = data.get("name", "Custom Playlist")
+    description = data.get("description", "AI-curated playlist")
+    seed_artists = data.get("seed_artists", [])
+    seed_genres = data.get("seed_genres", [])
+    size = min(data.get("size", 20), 50)
+
+    candidates = []
+    affinity = []
+    missing_seeds = []
+    for (kind, seed), seed_songs in zip(seeds, results):
+        if seed_songs is None:
+            missing_seeds.append(seed)
+            continue
+        # Tracks from a named artist match the request more closely than genre picks
+        seed_affinity = ARTIST_SEED_AFFINITY if kind == "artist" else GENRE_SEED_AFFINITY
+        candidates.extend(seed_songs)
+        affinity.extend([seed_affinity] * len(seed_songs))
+
+    popularity_range = data.get("popularity_range")
+    formatted_songs = rank_playlist(
+        candidates,
+        size,
+        affinity=affinity,
+        max_per_artist=data.get("max_per_artist"),
+        popularity_range=tuple(popularity_range) if popularity_range else None,
+        seed=data.get("seed")
+    )
+
+    # Calculate diversity
+    unique_artists = set(song.primary_artist for song in formatted_songs)
+    diversity_score = playlist_diversity(formatted_songs)
+
+    formatted_summary = f"'{playlist_name}': {len(formatted_songs)} songs | {len(unique_artists)} artists | Diversity: {diversity_score:.2f}"
+    if missing_seeds:
+        formatted_summary += f" | Partial: no results from {', '.join(missing_seeds)}"
+
+    return SmartPlaylistResult(
+        playlist_name=playlist_name,
+        description=description,
+        total_songs=len(formatted_songs),
+        songs=formatted_songs,
+        seed_artists=seed_artists,
+        seed_genres=seed_genres,
+        diversity_score=diversity_score,
+        missing_seeds=missing_seeds,
+        formatted_summary=formatted_summary
+    )
+
+def _playlist_error(e: Exception) -> SmartPlaylistResult:
+    return SmartPlaylistResult(
+        playlist_name="Error",
+        description="Failed to create playlist",
+        total_songs=0,
+        songs=[],
+        seed_artists=[],
+        seed_genres=[],
+        diversity_score=0.0,
+        formatted_summary=f"Playlist creation failed: {str(e)}",
+        error=str(e)
+    )
+
 @tool
+@memoize_tool(ttl=TOOL_CACHE_TTLS["search_tracks"])
 def search_tracks(query: str, limit: int = 10) -> TrackSearchResult:
     """
     Search for tracks on Spotify.
@@ -109,41 +443,21 @@ def search_tracks(query: str, limit: int = 10) -> TrackSearchResult:
     """
     try:
         spotify = get_spotify_client()
-        raw_results = spotify.search_songs(query, limit=min(limit, 50))
-
-        if not raw_results:
-            return TrackSearchResult(
-                query=query,
-                total_results=0,
-                tracks=[],
-                formatted_summary=f"No tracks found for query: {query}",
-                error="No results found"
-            )
-
-        tracks = [_format_track_data(track) for track in raw_results if 'error' not in track]
-
-        formatted_summary = f"Found {len(tracks)} tracks for '{query}'"
-        if tracks:
-            top_track = tracks[0]
-            formatted_summary += f" | Top result: {top_track.name} by {top_track.artist}"
-
-        return TrackSearchResult(
-            query=query,
-            total_results=len(tracks),
-            tracks=tracks,
-            formatted_summary=formatted_summary
-        )
+        return _track_search_result(query, spotify.search_songs(query, limit=min(limit, 50)))
+    except Exception as e:
+        return _track_search_error(query, e)
 
+@memoize_tool(ttl=TOOL_CACHE_TTLS["search_tracks"], name="search_tracks")
+async def asearch_tracks(query: str, limit: int = 10) -> TrackSearchResult:
+    """Coroutine implementation of search_tracks"""
+    try:
+        spotify = get_async_spotify_client()
+        return _track_search_result(query, await spotify.search_songs(query, limit=min(limit, 50)))
     except Exception as e:
-        return TrackSearchResult(
-            query=query,
-            total_results=0,
-            tracks=[],
-            formatted_summary=f"Search failed for '{query}': {str(e)}",
-            error=str(e)
-        )
+        return _track_search_error(query, e)
 
 @tool
+@memoize_tool(ttl=TOOL_CACHE_TTLS["get_artist_top_songs"])
 def get_artist_top_songs(artist_name: str, limit: int = 10) -> ArtistTopSongsResult:
     """
     Get top songs by an artist.
@@ -157,140 +471,128 @@ def get_artist_top_songs(artist_name: str, limit: int = 10) -> ArtistTopSongsRes
     """
     try:
         spotify = get_spotify_client()
-        raw_results = spotify.get_artist_top_songs(artist_name, limit=min(limit, 50))
-
-        if not raw_results:
-            return ArtistTopSongsResult(
-                artist_name=artist_name,
-                total_songs=0,
-                songs=[],
-                formatted_summary=f"No top songs found for {artist_name}",
-                error="Artist not found"
-            )
-
-        songs = [_format_track_data(song) for song in raw_results if 'error' not in song]
-
-        formatted_summary = f"{artist_name} top {len(songs)} songs"
-        if songs:
-            avg_popularity = sum(song.popularity for song in songs) / len(songs)
-            formatted_summary += f" | Avg popularity: {avg_popularity:.1f}/100"
-
-        return ArtistTopSongsResult(
-            artist_name=artist_name,
-            total_songs=len(songs),
-            songs=songs,
-            formatted_summary=formatted_summary
-        )
+        return _top_songs_result(artist_name, spotify.get_artist_top_songs(artist_name, limit=min(limit, 50)))
+    except Exception as e:
+        return _top_songs_error(artist_name, e)
 
+@memoize_tool(ttl=TOOL_CACHE_TTLS["get_artist_top_songs"], name="get_artist_top_songs")
+async def aget_artist_top_songs(artist_name: str, limit: int = 10) -> ArtistTopSongsResult:
+    """Coroutine implementation of get_artist_top_songs"""
+    try:
+        spotify = get_async_spotify_client()
+        return _top_songs_result(artist_name, await spotify.get_artist_top_songs(artist_name, limit=min(limit, 50)))
     except Exception as e:
-        return ArtistTopSongsResult(
-            artist_name=artist_name,
-            total_songs=0,
-            songs=[],
-            formatted_summary=f"Failed to get top songs for {artist_name}: {str(e)}",
-            error=str(e)
-        )
+        return _top_songs_error(artist_name, e)
 
 @tool
-def get_similar_songs(artist_name: str, limit: int = 10) -> ArtistTopSongsResult:
+@memoize_tool(ttl=TOOL_CACHE_TTLS["get_similar_songs"], seed_arg="seed")
+def get_similar_songs(artist_name: str, limit: int = 10, seed: Optional[int] = None) -> ArtistTopSongsResult:
     """
     Get songs similar to an artist's style.
 
     Args:
         artist_name: Name of the artist to find similar music to
         limit: Number of songs to return (default: 10, max: 50)
+        seed: Optional random seed for a reproducible selection
 
     Returns:
         Structured similar songs results
     """
     try:
         spotify = get_spotify_client()
-        raw_results = spotify.get_similar_songs(artist_name, limit=min(limit, 50))
-
-        if not raw_results:
-            return ArtistTopSongsResult(
-                artist_name=artist_name,
-                total_songs=0,
-                songs=[],
-                formatted_summary=f"No similar songs found for {artist_name}",
-                error="No similar artists found"
-            )
-
-        songs = [_format_track_data(song) for song in raw_results if 'error' not in song]
-
-        # Get unique artists for diversity metric
-        unique_artists = set(song.artist.split(', ')[0] for song in songs)
-        diversity_score = len(unique_artists) / len(songs) if songs else 0
-
-        formatted_summary = f"Similar to {artist_name}: {len(songs)} songs from {len(unique_artists)} artists | Diversity: {diversity_score:.2f}"
-
-        return ArtistTopSongsResult(
-            artist_name=f"Similar to {artist_name}",
-            total_songs=len(songs),
-            songs=songs,
-            formatted_summary=formatted_summary
-        )
+        return _similar_songs_result(artist_name, spotify.get_similar_songs(artist_name, limit=min(limit, 50), seed=seed))
+    except Exception as e:
+        return _similar_songs_error(artist_name, e)
 
+@memoize_tool(ttl=TOOL_CACHE_TTLS["get_similar_songs"], seed_arg="seed", name="get_similar_songs")
+async def aget_similar_songs(artist_name: str, limit: int = 10, seed: Optional[int] = None) -> ArtistTopSongsResult:
+    """Coroutine implementation of get_similar_songs"""
+    try:
+        spotify = get_async_spotify_client()
+        songs = await spotify.get_similar_songs(artist_name, limit=min(limit, 50), seed=seed)
+        return _similar_songs_result(artist_name, songs)
     except Exception as e:
-        return ArtistTopSongsResult(
-            artist_name=artist_name,
-            total_songs=0,
-            songs=[],
-            formatted_summary=f"Failed to get similar songs for {artist_name}: {str(e)}",
-            error=str(e)
-        )
+        return _similar_songs_error(artist_name, e)
 
 @tool
-def get_genre_songs(genre: str, limit: int = 10) -> GenreSongsResult:
+@memoize_tool(ttl=TOOL_CACHE_TTLS["get_genre_songs"], seed_arg="seed")
+def get_genre_songs(genre: str, limit: int = 10, seed: Optional[int] = None) -> GenreSongsResult:
     """
     Get songs from a specific genre.
 
     Args:
         genre: Genre name (e.g., "pop", "rock", "hip-hop", "electronic")
         limit: Number of songs to return (default: 10, max: 50)
+        seed: Optional random seed for a reproducible selection
 
     Returns:
         Structured genre songs with diversity metrics
     """
     try:
         spotify = get_spotify_client()
-        raw_results = spotify.get_genre_songs(genre, limit=min(limit, 50))
-
-        if not raw_results:
-            return GenreSongsResult(
-                genre=genre,
-                total_songs=0,
-                songs=[],
-                formatted_summary=f"No songs found for genre: {genre}",
-                error="Genre not found"
-            )
-
-        songs = [_format_track_data(song) for song in raw_results if 'error' not in song]
-
-        if songs:
-            avg_popularity = sum(song.popularity for song in songs) / len(songs)
-            unique_artists = set(song.artist.split(', ')[0] for song in songs)
-            formatted_summary = f"{genre.title()} genre: {len(songs)} songs from {len(unique_artists)} artists | Avg popularity: {avg_popularity:.1f}/100"
-        else:
-            formatted_summary = f"No valid {genre} songs found"
-
-        return GenreSongsResult(
-            genre=genre,
-            total_songs=len(songs),
-            songs=songs,
-            formatted_summary=formatted_summary
-        )
+        return _genre_songs_result(genre, spotify.get_genre_songs(genre, limit=min(limit, 50), seed=seed))
+    except Exception as e:
+        return _genre_songs_error(genre, e)
 
+@memoize_tool(ttl=TOOL_CACHE_TTLS["get_genre_songs"], seed_arg="seed", name="get_genre_songs")
+async def aget_genre_songs(genre: str, limit: int = 10, seed: Optional[int] = None) -> GenreSongsResult:
+    """Coroutine implementation of get_genre_songs"""
+    try:
+        spotify = get_async_spotify_client()
+        return _genre_songs_result(genre, await spotify.get_genre_songs(genre, limit=min(limit, 50), seed=seed))
     except Exception as e:
-        return GenreSongsResult(
-            genre=genre,
-            total_songs=0,
-            songs=[],
-            formatted_summary=f"Failed to get {genre} songs: {str(e)}",
-            error=str(e)
-        )
+        return _genre_songs_error(genre, e)
+
+def _build_playlist(data: Dict[str, Any]) -> SmartPlaylistResult:
+    """Fetch every seed concurrently and rank the playlist; seeds that fail or miss the deadline are skipped"""
+    spotify = get_spotify_client()
+    seeds = _playlist_seeds(data)
+    # With a seed, genre picks must not depend on which search variant answers first
+    shuffle_seed = data.get("seed")
+    fetches = [
+        partial(spotify.get_artist_top_songs, seed, limit=10) if kind == "artist"
+        else partial(spotify.get_genre_songs, seed, limit=20,
+                     stop_early=shuffle_seed is None, seed=shuffle_seed)
+        for kind, seed in seeds
+    ]
+    results = fan_out(fetches, max_concurrency=max(len(seeds), 1), timeout=config.SPOTIFY_PLAYLIST_DEADLINE)
+    return _playlist_result(data, seeds, results)
+
+async def _abuild_playlist(data: Dict[str, Any]) -> SmartPlaylistResult:
+    """Coroutine version of _build_playlist"""
+    spotify = get_async_spotify_client()
+    seeds = _playlist_seeds(data)
+    shuffle_seed = data.get("seed")
+    fetches = [
+        spotify.get_artist_top_songs(seed, limit=10) if kind == "artist"
+        else spotify.get_genre_songs(seed, limit=20,
+                                     stop_early=shuffle_seed is None, seed=shuffle_seed)
+        for kind, seed in seeds
+    ]
+    results = await afan_out(fetches, max_concurrency=max(len(seeds), 1), timeout=config.SPOTIFY_PLAYLIST_DEADLINE)
+    return _playlist_result(data, seeds, results)
+
+def _typed_playlist_data(name: str, description: str, seed_artists: Optional[List[str]],
+                         seed_genres: Optional[List[str]], size: int, max_per_artist: Optional[int],
+                         popularity_range: Optional[List[int]], seed: Optional[int]) -> Dict[str, Any]:
+    """The create_smart_playlist JSON parameters for typed arguments"""
+    data = {
+        "name": name,
+        "description": description,
+        "seed_artists": seed_artists or [],
+        "seed_genres": seed_genres or [],
+        "size": size,
+    }
+    optional = {"max_per_artist": max_per_artist, "popularity_range": popularity_range, "seed": seed}
+    data.update({key: value for key, value in optional.items() if value is not None})
+    return data
 
 @tool
+@memoize_tool(
+    ttl=TOOL_CACHE_TTLS["create_smart_playlist"],
+    normalizers={"query": normalize_json_argument},
+    seed_from=playlist_seed
+)
 def create_smart_playlist(query: str) -> SmartPlaylistResult:
     """
     Create a smart playlist based on criteria.
@@ -300,102 +602,250 @@ def create_smart_playlist(query: str) -> SmartPlaylistResult:
                {"name": "playlist name", "description": "description",
                 "seed_artists": ["artist1"], "seed_genres": ["genre1"],
                 "size": 20}
+               Optional: "max_per_artist": 2, "popularity_range": [40, 90],
+               "seed": 42 (same seed, same playlist)
 
     Returns:
         Structured smart playlist with songs and metadata
     """
     try:
-        data = json.loads(query)
-
-        playlist_name = data.get("name", "Custom Playlist")
-        description = data.get("description", "AI-curated playlist")
-        seed_artists = data.get("seed_artists", [])
-        seed_genres = data.get("seed_genres", [])
-        size = min(data.get("size", 20), 50)
+        return _build_playlist(json.loads(query))
+    except Exception as e:
+        return _playlist_error(e)
+
+@memoize_tool(
+    ttl=TOOL_CACHE_TTLS["create_smart_playlist"],
+    normalizers={"query": normalize_json_argument},
+    seed_from=playlist_seed,
+    name="create_smart_playlist"
+)
+async def acreate_smart_playlist(query: str) -> SmartPlaylistResult:
+    """Coroutine implementation of create_smart_playlist"""
+    try:
+        return await _abuild_playlist(json.loads(query))
+    except Exception as e:
+        return _playlist_error(e)
+
+@tool("create_smart_playlist")
+@memoize_tool(ttl=TOOL_CACHE_TTLS["create_smart_playlist"], seed_arg="seed", name="create_smart_playlist_typed")
+def create_smart_playlist_typed(name: str = "Custom Playlist", description: str = "AI-curated playlist",
+                                seed_artists: Optional[List[str]] = None, seed_genres: Optional[List[str]] = None,
+                                size: int = 20, max_per_artist: Optional[int] = None,
+                                popularity_range: Optional[List[int]] = None,
+                                seed: Optional[int] = None) -> SmartPlaylistResult:
+    """
+    Create a smart playlist from seed artists and genres.
 
-        spotify = get_spotify_client()
-        all_songs = []
-
-        # Get songs from seed artists
-        for artist in seed_artists[:3]:  # Limit to 3 artists
-            artist_songs = spotify.get_artist_top_songs(artist, limit=5)
-            all_songs.extend([song for song in artist_songs if 'error' not in song])
-
-        # Get songs from seed genres
-        for genre in seed_genres[:2]:  # Limit to 2 genres
-            genre_songs = spotify.get_genre_songs(genre, limit=8)
-            all_songs.extend([song for song in genre_songs if 'error' not in song])
-
-        # Remove duplicates and shuffle
-        seen_ids = set()
-        unique_songs = []
-        for song in all_songs:
-            if song['id'] not in seen_ids:
-                seen_ids.add(song['id'])
-                unique_songs.append(song)
-
-        random.shuffle(unique_songs)
-        playlist_songs = unique_songs[:size]
-
-        # Convert to SpotifyTrackData models
-        formatted_songs = [_format_track_data(song) for song in playlist_songs]
-
-        # Calculate diversity
-        unique_artists = set(song.artist.split(', ')[0] for song in formatted_songs)
-        diversity_score = len(unique_artists) / len(formatted_songs) if formatted_songs else 0
-
-        formatted_summary = f"'{playlist_name}': {len(formatted_songs)} songs | {len(unique_artists)} artists | Diversity: {diversity_score:.2f}"
-
-        return SmartPlaylistResult(
-            playlist_name=playlist_name,
-            description=description,
-            total_songs=len(formatted_songs),
-            songs=formatted_songs,
-            seed_artists=seed_artists,
-            seed_genres=seed_genres,
-            diversity_score=diversity_score,
-            formatted_summary=formatted_summary
-        )
+    Args:
+        name: Playlist name
+        description: Playlist description
+        seed_artists: Up to 3 artists to build around
+        seed_genres: Up to 2 genres to build around
+        size: Number of songs (default: 20, max: 50)
+        max_per_artist: Cap on songs per artist
+        popularity_range: Inclusive [min, max] popularity (0-100) songs must fall in
+        seed: Optional random seed (same seed, same playlist)
 
+    Returns:
+        Structured smart playlist with songs and metadata
+    """
+    try:
+        return _build_playlist(_typed_playlist_data(
+            name, description, seed_artists, seed_genres, size, max_per_artist, popularity_range, seed
+        ))
     except Exception as e:
-        return SmartPlaylistResult(
-            playlist_name="Error",
-            description="Failed to create playlist",
-            total_songs=0,
-            songs=[],
-            seed_artists=[],
-            seed_genres=[],
-            diversity_score=0.0,
-            formatted_summary=f"Playlist creation failed: {str(e)}",
-            error=str(e)
+        return _playlist_error(e)
+
+@memoize_tool(ttl=TOOL_CACHE_TTLS["create_smart_playlist"], seed_arg="seed", name="create_smart_playlist_typed")
+async def acreate_smart_playlist_typed(name: str = "Custom Playlist", description: str = "AI-curated playlist",
+                                       seed_artists: Optional[List[str]] = None,
+                                       seed_genres: Optional[List[str]] = None,
+                                       size: int = 20, max_per_artist: Optional[int] = None,
+                                       popularity_range: Optional[List[int]] = None,
+                                       seed: Optional[int] = None) -> SmartPlaylistResult:
+    """Coroutine implementation of create_smart_playlist_typed"""
+    try:
+        return await _abuild_playlist(_typed_playlist_data(
+            name, description, seed_artists, seed_genres, size, max_per_artist, popularity_range, seed
+        ))
+    except Exception as e:
+        return _playlist_error(e)
+
+def _batch_items(artists: Optional[List[str]], genres: Optional[List[str]],
+                 search_terms: Optional[List[str]]) -> List[Tuple[str, str]]:
+    """(kind, name) for every distinct item to resolve, capped at MAX_BATCH_ITEMS"""
+    items = []
+    seen = set()
+    for kind, names in (("artist", artists), ("genre", genres), ("search", search_terms)):
+        for name in names or []:
+            key = (kind, " ".join(name.casefold().split()))
+            if name.strip() and key not in seen:
+                seen.add(key)
+                items.append((kind, name.strip()))
+    return items[:MAX_BATCH_ITEMS]
+
+def _batch_result(items: List[Tuple[str, str]], results: List[Optional[List[Track]]],
+                  limit: int) -> BatchLookupResult:
+    """Merge per-item songs round-robin so every item is represented, dropping duplicates"""
+    if not items:
+        return BatchLookupResult(
+            artists=[], genres=[], search_terms=[], total_songs=0, songs=[],
+            formatted_summary="Nothing to look up: give at least one artist, genre or search term",
+            error="No items"
         )
 
-# Initialize Tavily search tool
-try:
-    tavily_search = TavilySearch(
-        api_key=config.TAVILY_API_KEY,
-        max_results=5,
-        search_depth="advanced",
-        include_answer=True,
-        include_raw_content=False,
-        include_images=False
+    songs_per_item = {}
+    missing = []
+    queues = []
+    for (_, name), item_songs in zip(items, results):
+        if not item_songs:
+            missing.append(name)
+        else:
+            queues.append((name, list(item_songs)))
+
+    seen_ids = set()
+    songs = []
+    position = 0
+    while len(songs) < limit and any(position < len(queue) for _, queue in queues):
+        for name, queue in queues:
+            if position < len(queue) and queue[position].id not in seen_ids and len(songs) < limit:
+                seen_ids.add(queue[position].id)
+                songs.append(queue[position])
+                songs_per_item[name] = songs_per_item.get(name, 0) + 1
+        position += 1
+
+    artists = [name for kind, name in items if kind == "artist"]
+    genres = [name for kind, name in items if kind == "genre"]
+    search_terms = [name for kind, name in items if kind == "search"]
+    unique_artists = set(song.primary_artist for song in songs)
+    formatted_summary = f"Batch lookup of {len(items)} items: {len(songs)} songs from {len(unique_artists)} artists"
+    if missing:
+        formatted_summary += f" | No results from {', '.join(missing)}"
+
+    return BatchLookupResult(
+        artists=artists,
+        genres=genres,
+        search_terms=search_terms,
+        total_songs=len(songs),
+        songs=songs,
+        songs_per_item=songs_per_item,
+        missing=missing,
+        formatted_summary=formatted_summary,
+        error=None if songs else "No results found"
     )
-    SPOTIFY_TOOLS = [
-        search_tracks,
-        get_artist_top_songs,
-        get_similar_songs,
-        get_genre_songs,
-        create_smart_playlist,
-        tavily_search
-    ]
-except Exception as e:
-    print(f"Warning: Tavily search not available: {e}")
-    SPOTIFY_TOOLS = [
+
+def _batch_error(artists: Optional[List[str]], genres: Optional[List[str]],
+                 search_terms: Optional[List[str]], e: Exception) -> BatchLookupResult:
+    return BatchLookupResult(
+        artists=artists or [],
+        genres=genres or [],
+        search_terms=search_terms or [],
+        total_songs=0,
+        songs=[],
+        formatted_summary=f"Batch lookup failed: {str(e)}",
+        error=str(e)
+    )
+
+@tool
+@memoize_tool(ttl=TOOL_CACHE_TTLS["batch_music_lookup"], seed_from=batch_seed)
+def batch_music_lookup(artists: Optional[List[str]] = None, genres: Optional[List[str]] = None,
+                       search_terms: Optional[List[str]] = None, similar: bool = False,
+                       limit: int = 30, seed: Optional[int] = None) -> BatchLookupResult:
+    """
+    Look up several artists, genres and search terms in ONE call.
+
+    Use this instead of calling get_artist_top_songs, get_similar_songs,
+    get_genre_songs or search_tracks once per item. All items are resolved
+    concurrently and their songs merged without duplicates.
+
+    Args:
+        artists: Artist names (top songs, or similar songs when similar is true)
+        genres: Genre names
+        search_terms: Free-text track searches
+        similar: Find songs similar to the artists instead of their own top songs
+        limit: Total number of songs to return (default: 30, max: 50)
+        seed: Optional random seed for a reproducible selection
+
+    Returns:
+        Merged songs with per-item counts and any items that found nothing
+    """
+    try:
+        items = _batch_items(artists, genres, search_terms)
+        spotify = get_spotify_client()
+        fetches = []
+        for kind, name in items:
+            if kind == "artist" and similar:
+                fetches.append(partial(spotify.get_similar_songs, name, limit=BATCH_SONGS_PER_ITEM, seed=seed))
+            elif kind == "artist":
+                fetches.append(partial(spotify.get_artist_top_songs, name, limit=BATCH_SONGS_PER_ITEM))
+            elif kind == "genre":
+                fetches.append(partial(spotify.get_genre_songs, name, limit=BATCH_SONGS_PER_ITEM,
+                                       stop_early=seed is None, seed=seed))
+            else:
+                fetches.append(partial(spotify.search_songs, name, limit=BATCH_SONGS_PER_ITEM))
+        results = fan_out(fetches, max_concurrency=max(len(fetches), 1), timeout=config.SPOTIFY_BATCH_DEADLINE)
+        return _batch_result(items, results, min(limit, 50))
+    except Exception as e:
+        return _batch_error(artists, genres, search_terms, e)
+
+@memoize_tool(ttl=TOOL_CACHE_TTLS["batch_music_lookup"], seed_from=batch_seed, name="batch_music_lookup")
+async def abatch_music_lookup(artists: Optional[List[str]] = None, genres: Optional[List[str]] = None,
+                              search_terms: Optional[List[str]] = None, similar: bool = False,
+                              limit: int = 30, seed: Optional[int] = None) -> BatchLookupResult:
+    """Coroutine implementation of batch_music_lookup"""
+    try:
+        items = _batch_items(artists, genres, search_terms)
+        spotify = get_async_spotify_client()
+        fetches = []
+        for kind, name in items:
+            if kind == "artist" and similar:
+                fetches.append(spotify.get_similar_songs(name, limit=BATCH_SONGS_PER_ITEM, seed=seed))
+            elif kind == "artist":
+                fetches.append(spotify.get_artist_top_songs(name, limit=BATCH_SONGS_PER_ITEM))
+            elif kind == "genre":
+                fetches.append(spotify.get_genre_songs(name, limit=BATCH_SONGS_PER_ITEM,
+                                                       stop_early=seed is None, seed=seed))
+            else:
+                fetches.append(spotify.search_songs(name, limit=BATCH_SONGS_PER_ITEM))
+        results = await afan_out(fetches, max_concurrency=max(len(fetches), 1), timeout=config.SPOTIFY_BATCH_DEADLINE)
+        return _batch_result(items, results, min(limit, 50))
+    except Exception as e:
+        return _batch_error(artists, genres, search_terms, e)
+
+# Coroutine implementations, used when the agent runs through ainvoke/astream.
+# The async client always talks to Spotify directly, so with a recording or
+# replaying transport the tools keep their sync path (run in a thread).
+if config.SPOTIFY_TRANSPORT == "live":
+    search_tracks.coroutine = asearch_tracks
+    get_artist_top_songs.coroutine = aget_artist_top_songs
+    get_similar_songs.coroutine = aget_similar_songs
+    get_genre_songs.coroutine = aget_genre_songs
+    create_smart_playlist.coroutine = acreate_smart_playlist
+    create_smart_playlist_typed.coroutine = acreate_smart_playlist_typed
+    batch_music_lookup.coroutine = abatch_music_lookup
+
+def get_spotify_tools(typed_arguments: bool = False) -> List:
+    """
+    Get the agent's tool list, building the web search tool on first use.
+
+    With typed_arguments, create_smart_playlist takes typed arguments instead
+    of a JSON string, for agents that call tools natively.
+    """
+    tools = [
         search_tracks,
         get_artist_top_songs,
         get_similar_songs,
         get_genre_songs,
-        create_smart_playlist
+        create_smart_playlist_typed if typed_arguments else create_smart_playlist,
+        batch_music_lookup
     ]
-
-print(f"Loaded {len(SPOTIFY_TOOLS)} Spotify tools")
\ No newline at end of file
+    web_search = get_web_search_tool()
+    if web_search is not None:
+        tools.append(web_search)
+    return tools
+
+def __getattr__(name: str):
+    # SPOTIFY_TOOLS is assembled lazily so importing this module never builds Tavily
+    if name == "SPOTIFY_TOOLS":
+        return get_spotify_tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,191 @@
+"""
+Memoization for the agent's LangChain tools.
+
+Identical tool calls within a tool's TTL return the previously built result
+model instead of going back to Spotify. Calls are keyed by tool name plus
+normalized arguments (defaults applied, strings case-folded and whitespace
+collapsed), so get_artist_top_songs("Drake") and
+get_artist_top_songs(" drake ", 10) share an entry.
+
+Coroutine tool implementations are memoized the same way; pass the sync
+tool's name so both implementations share one cache.
+
+Tools whose output is random (shuffled results) are only memoized when the
+caller fixes a seed; unseeded calls bypass the cache. Results carrying an
+error are never stored.
+
+Apply memoize_tool below @tool so LangChain still sees the original
+signature and docstring:
+
+    @tool
+    @memoize_tool(ttl=3600)
+    def get_artist_top_songs(artist_name: str, limit: int = 10): ...
+"""
+import functools
+import inspect
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .cache import TTLCache, MISSING
+
+def normalize_value(value: Any) -> Hashable:
+    """Canonical, hashable form of a tool argument"""
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize_value(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_value(item) for item in value)
+    return value
+
+def normalize_json_argument(value: str) -> Hashable:
+    """Canonical form of a JSON-string argument (key order and whitespace ignored)"""
+    try:
+        return normalize_value(json.loads(value))
+    except (TypeError, ValueError):
+        return normalize_value(value)
+
+class _ToolCacheStats:
+    __slots__ = ("bypassed", "uncacheable")
+
+    def __init__(self):
+        self.bypassed = 0
+        self.uncacheable = 0
+
+class ToolMemoizer:
+    """Per-tool TTL caches with hit/miss/bypass accounting"""
+
+    def __init__(self, maxsize: int = 256, enabled: bool = True):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._caches: Dict[str, TTLCache] = {}
+        self._stats: Dict[str, _ToolCacheStats] = {}
+
+    def _cache_for(self, name: str, ttl: float) -> TTLCache:
+        with self._lock:
+            if name not in self._caches:
+                self._caches[name] = TTLCache(maxsize=self.maxsize, ttl=ttl)
+                self._stats[name] = _ToolCacheStats()
+            return self._caches[name]
+
+    def memoize(self, ttl: float, seed_arg: Optional[str] = None,
+                normalizers: Optional[Dict[str, Callable[[Any], Hashable]]] = None,
+                seed_from: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                name: Optional[str] = None) -> Callable:
+        """
+        Decorate a tool function so identical calls are served from cache
+
+        Args:
+            ttl: Seconds a result stays valid
+            seed_arg: Argument holding the random seed; when set, calls without a seed bypass the cache
+            normalizers: Per-argument normalizers overriding normalize_value
+            seed_from: Extracts the seed from the bound arguments, for seeds nested in other arguments
+            name: Cache name (defaults to the function name)
+        """
+        normalizers = normalizers or {}
+
+        def decorator(fn: Callable) -> Callable:
+            cache_name = name or fn.__name__
+            signature = inspect.signature(fn)
+            cache = self._cache_for(cache_name, ttl)
+
+            def lookup(args, kwargs):
+                """(key, cached result); a None key means the call bypasses the cache"""
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = bound.arguments
+                if seed_arg is not None or seed_from is not None:
+                    seed = seed_from(arguments) if seed_from is not None else arguments.get(seed_arg)
+                    if seed is None:
+                        with self._lock:
+                            self._stats[cache_name].bypassed += 1
+                        return None, MISSING
+
+                key = tuple(
+                    (arg, normalizers.get(arg, normalize_value)(value))
+                    for arg, value in arguments.items()
+                )
+                return key, cache.get(key)
+
+            def store(key, result):
+                if getattr(result, "error", None):
+                    with self._lock:
+                        self._stats[cache_name].uncacheable += 1
+                else:
+                    cache.set(key, result)
+
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    key, result = lookup(args, kwargs)
+                    if result is not MISSING:
+                        return result
+                    result = await fn(*args, **kwargs)
+                    if key is not None:
+                        store(key, result)
+                    return result
+
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                key, result = lookup(args, kwargs)
+                if result is not MISSING:
+                    return result
+                result = fn(*args, **kwargs)
+                if key is not None:
+                    store(key, result)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    def clear(self):
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            names = list(self._caches)
+        tools = {}
+        for name in names:
+            stats = self._caches[name].stats()
+            stats["ttl"] = self._caches[name].ttl
+            stats["bypassed"] = self._stats[name].bypassed
+            stats["uncacheable"] = self._stats[name].uncacheable
+            tools[name] = stats
+        return {"enabled": self.enabled, "tools": tools}
+
+_default_memoizer: Optional[ToolMemoizer] = None
+_default_memoizer_lock = threading.Lock()
+
+def get_tool_memoizer() -> ToolMemoizer:
+    """Get the process-wide memoizer shared by the Spotify tools"""
+    global _default_memoizer
+    with _default_memoizer_lock:
+        if _default_memoizer is None:
+            _default_memoizer = ToolMemoizer()
+        return _default_memoizer
+
+def configure_tool_memoizer(maxsize: int, enabled: bool = True) -> ToolMemoizer:
+    """Set the size bound and on/off switch of the process-wide memoizer, in place"""
+    memoizer = get_tool_memoizer()
+    with memoizer._lock:
+        memoizer.maxsize = maxsize
+        memoizer.enabled = enabled
+        for cache in memoizer._caches.values():
+            cache.maxsize = maxsize
+    return memoizer
+
+def memoize_tool(ttl: float, **options) -> Callable:
+    """Memoize a tool function with the process-wide memoizer (see ToolMemoizer.memoize)"""
+    return get_tool_memoizer().memoize(ttl, **options)
@@ -0,0 +1,134 @@
+"""
+Compact track representation used from the Spotify client through the tools.
+
+A Track is built once from the raw Spotify payload and passed by reference
+everywhere inside the agent. It is only converted to a plain dict at the
+edge (API responses, LangSmith outputs) via to_dict(), which Pydantic calls
+automatically when a tool result model containing tracks is dumped.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+class Track:
+    """Slotted, attribute-only track record"""
+
+    __slots__ = (
+        "id", "name", "artists", "album", "duration_ms", "popularity",
+        "spotify_url", "preview_url", "album_image_url", "album_image_small",
+    )
+
+    def __init__(self, id: str, name: str, artists: Tuple[str, ...], album: str, duration_ms: int,
+                 popularity: int, spotify_url: str, preview_url: Optional[str] = None,
+                 album_image_url: Optional[str] = None, album_image_small: Optional[str] = None):
+        self.id = id
+        self.name = name
+        self.artists = artists
+        self.album = album
+        self.duration_ms = duration_ms
+        self.popularity = popularity
+        self.spotify_url = spotify_url
+        self.preview_url = preview_url
+        self.album_image_url = album_image_url
+        self.album_image_small = album_image_small
+
+    @classmethod
+    def from_spotify(cls, track: Dict[str, Any]) -> "Track":
+        """Build a Track from a raw Spotify track object"""
+        # Extract album images
+        album = track['album']
+        album_images = album.get('images', [])
+        album_image_url = None
+        album_image_small = None
+
+        # Get the best image sizes (Spotify typically returns 640x640, 300x300, 64x64)
+        for image in album_images:
+            if image.get('height') == 640:  # Large image
+                album_image_url = image.get('url')
+            elif image.get('height') == 64:  # Small image
+                album_image_small = image.get('url')
+
+        # If no exact sizes found, use first available as large, last as small
+        if not album_image_url and album_images:
+            album_image_url = album_images[0].get('url')
+        if not album_image_small and len(album_images) > 1:
+            album_image_small = album_images[-1].get('url')
+        elif not album_image_small and album_images:
+            album_image_small = album_images[0].get('url')
+
+        return cls(
+            track['id'],
+            track['name'],
+            tuple(artist['name'] for artist in track['artists']),
+            album['name'],
+            track['duration_ms'],
+            track['popularity'],
+            track['external_urls']['spotify'],
+            track.get('preview_url'),
+            album_image_url,
+            album_image_small,
+        )
+
+    @property
+    def artist(self) -> str:
+        """All artist names, comma separated"""
+        return ', '.join(self.artists)
+
+    @property
+    def primary_artist(self) -> str:
+        return self.artists[0] if self.artists else ''
+
+    @property
+    def duration(self) -> str:
+        """Duration in MM:SS format"""
+        seconds = self.duration_ms // 1000
+        return f"{seconds // 60}:{seconds % 60:02d}"
+
+    @property
+    def formatted_summary(self) -> str:
+        return f"{self.name} by {self.artist} | {self.album} | Popularity: {self.popularity}/100"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for API and tracing output"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'artist': self.artist,
+            'album': self.album,
+            'popularity': self.popularity,
+            'duration': self.duration,
+            'spotify_url': self.spotify_url,
+            'preview_url': self.preview_url,
+            'album_image_url': self.album_image_url,
+            'album_image_small': self.album_image_small,
+            'formatted_summary': self.formatted_summary,
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        """Read-only dict-style access for callers written against the old track dicts"""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Track) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"Track(id={self.id!r}, name={self.name!r}, artist={self.artist!r}, popularity={self.popularity})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: Any) -> Any:
+        """Let Pydantic models hold Tracks as-is and dump them with to_dict()"""
+        from pydantic_core import core_schema
+
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda track: track.to_dict(), when_used="always"
+            ),
+        )
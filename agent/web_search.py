@@ -0,0 +1,221 @@
+"""
+Tavily web search tool for current music news and trends.
+
+langchain_tavily is only imported, and the tool only built, the first time
+the agent's tool list is assembled.
+
+The tool the agent sees is CachedWebSearch, which keeps Tavily's name,
+description and arguments but answers repeated queries from a cache.
+Queries are normalized (case, whitespace, trailing punctuation) before
+lookup, and each result lives for a TTL picked by the kind of query: news-
+like queries ("latest", "this week", topic="news", ...) expire quickly,
+evergreen ones (artist bios, genre histories) last a day.
+
+TAVILY_BACKEND selects where uncached queries go:
+    live    Tavily (default)
+    record  Tavily, saving every result to TAVILY_RECORDINGS_PATH
+    replay  Only the recordings; no network or API key needed
+"""
+import atexit
+import gzip
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+
+from . import config
+from .cache import TTLCache, MISSING
+
+_NEWS_TERMS = re.compile(
+    r"\b(latest|new|newest|news|today|tonight|yesterday|this (week|month|year)|recent|recently|"
+    r"upcoming|trending|current|currently|now|charts?|tour|tours|announced?|release date|"
+    r"grammys?|awards?|billboard)\b"
+)
+_YEAR = re.compile(r"\b(19|20)\d{2}\b")
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop surrounding punctuation"""
+    return " ".join(query.casefold().split()).strip(" ?!.,;:\"'")
+
+def is_news_query(query: str, topic: Optional[str] = None, time_range: Optional[str] = None) -> bool:
+    """Whether results for a query go stale quickly"""
+    if topic == "news" or time_range in ("day", "week"):
+        return True
+    normalized = normalize_query(query)
+    return bool(_NEWS_TERMS.search(normalized) or _YEAR.search(normalized))
+
+def search_key(arguments: Dict[str, Any]) -> Hashable:
+    """Cache key: normalized query plus every other argument that was set"""
+    options = tuple(sorted(
+        (name, json.dumps(value, sort_keys=True))
+        for name, value in arguments.items()
+        if name != "query" and value is not None
+    ))
+    return (normalize_query(arguments["query"]), options)
+
+class SearchRecordings:
+    """Recorded search results, persisted as gzipped JSON"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._results: Dict[str, Any] = {}
+        self._dirty = False
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self._results = json.load(f)
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        return json.dumps(key)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._results.get(self._key(key))
+
+    def put(self, key: Hashable, result: Dict[str, Any]):
+        with self._lock:
+            self._results[self._key(key)] = result
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data, self._dirty = dict(self._results), False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+class CachedWebSearch(BaseTool):
+    """A search tool answering repeated queries from a TTL cache"""
+
+    _search: Callable[..., Dict[str, Any]] = PrivateAttr()
+    _cache: TTLCache = PrivateAttr()
+    _recordings: Optional[SearchRecordings] = PrivateAttr(default=None)
+    _replay: bool = PrivateAttr(default=False)
+    _news_ttl: float = PrivateAttr(default=15 * 60)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _news_queries: int = PrivateAttr(default=0)
+    _evergreen_queries: int = PrivateAttr(default=0)
+    _recording_misses: int = PrivateAttr(default=0)
+
+    def __init__(self, inner: BaseTool, backend: str = "live",
+                 recordings: Optional[SearchRecordings] = None, maxsize: int = 512,
+                 news_ttl: float = 15 * 60, evergreen_ttl: float = 24 * 3600):
+        """
+        Args:
+            inner: Tool whose name, description and arguments are exposed (and which runs live searches)
+            backend: "live", "record" or "replay"
+            recordings: Where results are recorded to or replayed from
+            maxsize: Cached queries kept in memory
+            news_ttl: Seconds a result for a news-like query stays cached
+            evergreen_ttl: Seconds any other result stays cached
+        """
+        super().__init__(name=inner.name, description=inner.description, args_schema=inner.args_schema)
+        if backend not in ("live", "record", "replay"):
+            raise ValueError(f"Unknown TAVILY_BACKEND: {backend} (expected live, record or replay)")
+        if backend != "live" and recordings is None:
+            raise ValueError(f"TAVILY_BACKEND={backend} needs a recordings file")
+        self._search = inner.invoke
+        self._cache = TTLCache(maxsize=maxsize, ttl=evergreen_ttl)
+        self._news_ttl = news_ttl
+        self._recordings = recordings
+        self._replay = backend == "replay"
+        if backend == "record":
+            atexit.register(recordings.save)
+        elif backend == "live":
+            self._recordings = None
+
+    def _run(self, query: str, run_manager: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        arguments = {"query": query, **kwargs}
+        key = search_key(arguments)
+        result = self._cache.get(key)
+        if result is not MISSING:
+            return result
+
+        if self._replay:
+            result = self._recordings.get(key)
+            if result is None:
+                with self._lock:
+                    self._recording_misses += 1
+                return {"query": query, "results": [], "error": "No recorded results for this query"}
+        else:
+            result = self._search({name: value for name, value in arguments.items() if value is not None})
+            if isinstance(result, dict) and "error" not in result and self._recordings is not None:
+                self._recordings.put(key, result)
+
+        if isinstance(result, dict) and "error" in result:
+            return result
+        news = is_news_query(query, kwargs.get("topic"), kwargs.get("time_range"))
+        with self._lock:
+            if news:
+                self._news_queries += 1
+            else:
+                self._evergreen_queries += 1
+        self._cache.set(key, result, ttl=self._news_ttl if news else None)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        with self._lock:
+            stats.update({
+                "backend": "replay" if self._replay else ("record" if self._recordings is not None else "live"),
+                "news_queries_cached": self._news_queries,
+                "evergreen_queries_cached": self._evergreen_queries,
+                "recordings": len(self._recordings) if self._recordings is not None else None,
+                "recording_misses": self._recording_misses,
+            })
+        return stats
+
+_web_search: Optional[CachedWebSearch] = None
+_web_search_unavailable = False
+_web_search_lock = threading.Lock()
+
+def get_web_search_tool() -> Optional[CachedWebSearch]:
+    """Get or create the cached Tavily search tool, or None when it can't be built."""
+    global _web_search, _web_search_unavailable
+    with _web_search_lock:
+        if _web_search is None and not _web_search_unavailable:
+            try:
+                from langchain_tavily import TavilySearch
+
+                backend = config.TAVILY_BACKEND
+                # Replay never calls Tavily, so it needs no real key
+                api_key = config.TAVILY_API_KEY or ("replay" if backend == "replay" else None)
+                tavily_search = TavilySearch(
+                    **({"tavily_api_key": api_key} if api_key else {}),
+                    max_results=5,
+                    search_depth="advanced",
+                    include_answer=True,
+                    include_raw_content=False,
+                    include_images=False
+                )
+                recordings = SearchRecordings(config.TAVILY_RECORDINGS_PATH) if backend != "live" else None
+                _web_search = CachedWebSearch(
+                    tavily_search,
+                    backend=backend,
+                    recordings=recordings,
+                    maxsize=config.TAVILY_CACHE_SIZE,
+                    news_ttl=config.TAVILY_NEWS_TTL,
+                    evergreen_ttl=config.TAVILY_EVERGREEN_TTL
+                )
+            except Exception as e:
+                print(f"Warning: Tavily search not available: {e}")
+                _web_search_unavailable = True
+        return _web_search
+
+def get_web_search_stats() -> Optional[Dict[str, Any]]:
+    """Cache and backend statistics for web search, if the tool has been built"""
+    return _web_search.stats() if _web_search is not None else None
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Agent construction cost: building a SpotifyMusicAgent per request vs. checking
+one out of a warm AgentPool.
+
+Builds agents back to back (the first build also pays for lazy imports and
+client setup) and then times pool checkouts on a pool that has been warmed
+up. No LLM, Spotify or Tavily calls are made, but the agent's constructor
+needs OPENAI_API_KEY, TAVILY_API_KEY and the Spotify credentials to be set
+(any placeholder values work).
+
+Usage:
+    python benchmarks/agent_construction.py [--runs 20] [--mode react] [--pool-size 4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.music_agent import SpotifyMusicAgent, AGENT_MODES
+from agent.pool import AgentPool
+
+def report(label: str, seconds: List[float]):
+    ms = sorted(s * 1000 for s in seconds)
+    print(f"  {label:28s} mean {statistics.mean(ms):8.3f} ms  p50 {statistics.median(ms):8.3f} ms  "
+          f"max {ms[-1]:8.3f} ms  ({len(ms)} runs)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--mode", choices=AGENT_MODES, help="Agent mode (defaults to AGENT_MODE)")
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    SpotifyMusicAgent(mode=args.mode)
+    first = time.perf_counter() - started
+
+    builds = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        SpotifyMusicAgent(mode=args.mode)
+        builds.append(time.perf_counter() - started)
+
+    pool = AgentPool(size=args.pool_size, mode=args.mode)
+    warm_up = pool.warm_up()
+    checkouts = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        with pool.agent():
+            checkouts.append(time.perf_counter() - started)
+
+    print(f"\nAgent construction ({args.mode or 'default'} mode)")
+    print("=" * 72)
+    print(f"  {'first build':28s} {first * 1000:8.3f} ms")
+    report("build per request", builds)
+    print(f"  {'pool warm-up':28s} {warm_up * 1000:8.3f} ms  ({args.pool_size} agents, paid once)")
+    report("pool checkout", checkouts)
+    print(f"\n  Saved per request: {(statistics.mean(builds) - statistics.mean(checkouts)) * 1000:.3f} ms")
+
+if __name__ == "__main__":
+    main()
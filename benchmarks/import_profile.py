@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Import-time profile: cold-start cost of the agent package, per module.
+
+Imports each target in a fresh interpreter with `python -X importtime` and
+reports the wall time of the import plus the slowest modules it pulled in
+(cumulative microseconds, as printed by -X importtime).
+
+Usage:
+    python benchmarks/import_profile.py [--top 15] [--runs 3] [target ...]
+
+Targets default to the package entry points used by the API server, the
+evaluations and the benchmarks.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = [
+    "agent",
+    "agent.client",
+    "agent.spotify_tools",
+    "agent.music_agent",
+    "agent.api",
+]
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def profile(target: str) -> Tuple[float, Dict[str, Tuple[int, int, int]]]:
+    """Import target in a fresh interpreter; return (total seconds, {module: (self_us, cumulative_us, depth)})"""
+    code = f"import time; t = time.perf_counter(); import {target}; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list per target")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per target (median is reported)")
+    args = parser.parse_args()
+
+    summary: List[Tuple[str, float, int]] = []
+    for target in args.targets:
+        runs = [profile(target) for _ in range(args.runs)]
+        seconds = statistics.median(total for total, _ in runs)
+        _, modules = runs[-1]
+        summary.append((target, seconds, len(modules)))
+
+        print(f"\nimport {target}: {seconds * 1000:.0f} ms, {len(modules)} modules")
+        print("-" * 72)
+        slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+        for name, (self_us, cumulative_us, depth) in slowest:
+            print(f"  {cumulative_us / 1000:8.1f} ms cumulative {self_us / 1000:7.1f} ms self  {name}")
+
+    print("\nSummary")
+    print("=" * 72)
+    for target, seconds, count in summary:
+        print(f"  {target:28s} {seconds * 1000:8.0f} ms  {count:5d} modules")
+
+if __name__ == "__main__":
+    main()
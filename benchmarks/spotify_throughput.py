@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: Spotify client calls replayed from a cassette.
+
+Runs search_songs, get_artist_top_songs and get_similar_songs against a
+recorded cassette (no network, no credentials) from several worker threads
+and reports calls/second and latency percentiles per method.
+
+Record a cassette first by running the agent (or evaluations) with:
+    SPOTIFY_TRANSPORT=record SPOTIFY_CASSETTE_PATH=.cache/spotify_cassette.json.gz
+
+Usage:
+    python benchmarks/spotify_throughput.py [--cassette PATH] [--workers 8] [--calls 200]
+        [--latency 0.05] [--jitter 0.02] [--error-rate 0.01] [--response-cache]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Set
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.cache import ArtistIdCache, ResponseCache
+from agent.cassette import Cassette, ReplayTransport
+from agent.client import WorkingSpotifyClient
+from agent.rate_limit import RequestScheduler
+
+def recorded_inputs(cassette: Cassette) -> Dict[str, List[str]]:
+    """Pick search queries and artist names that the cassette can answer"""
+    queries: Set[str] = set()
+    artists: Set[str] = set()
+    for method, path, params in cassette.keys():
+        params = dict(params)
+        if path.endswith("/search") and params.get("type") == "track":
+            queries.add(params["q"])
+        elif path.endswith("/search") and params.get("type") == "artist":
+            artists.add(params["q"])
+    return {"queries": sorted(queries), "artists": sorted(artists)}
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+def run(name: str, call: Callable[[int], object], calls: int, workers: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    failures = 0
+
+    def timed(i: int):
+        started = time.perf_counter()
+        try:
+            call(i)
+            return time.perf_counter() - started, True
+        except Exception:
+            return time.perf_counter() - started, False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for latency, ok in executor.map(timed, range(calls)):
+            latencies.append(latency)
+            failures += not ok
+    elapsed = time.perf_counter() - started
+
+    return {
+        "calls_per_second": calls / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "failures": failures,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", default=os.getenv("SPOTIFY_CASSETTE_PATH", ".cache/spotify_cassette.json.gz"))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=200, help="Calls per method")
+    parser.add_argument("--latency", type=float, default=0.0, help="Injected latency per request (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate", type=float, default=10_000, help="Client-side rate limit (requests/second)")
+    parser.add_argument("--response-cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cassette):
+        parser.error(f"cassette not found: {args.cassette} (record one with SPOTIFY_TRANSPORT=record)")
+
+    cassette = Cassette(args.cassette)
+    inputs = recorded_inputs(cassette)
+    transport = ReplayTransport(cassette, latency=args.latency, jitter=args.jitter,
+                                error_rate=args.error_rate, seed=args.seed)
+    client = WorkingSpotifyClient(
+        "replay", "replay",
+        max_concurrency=args.workers,
+        artist_cache=ArtistIdCache(path=None),
+        response_cache=ResponseCache() if args.response_cache else ResponseCache(ttls=()),
+        scheduler=RequestScheduler(rate=args.rate, burst=int(args.rate)),
+        http=transport,
+    )
+
+    benchmarks = []
+    if inputs["queries"]:
+        queries = inputs["queries"]
+        benchmarks.append(("search_songs", lambda i: client.search_songs(queries[i % len(queries)])))
+    if inputs["artists"]:
+        artists = inputs["artists"]
+        benchmarks.append(("get_artist_top_songs", lambda i: client.get_artist_top_songs(artists[i % len(artists)])))
+        benchmarks.append(("get_similar_songs", lambda i: client.get_similar_songs(artists[i % len(artists)])))
+    if not benchmarks:
+        parser.error("cassette has no recorded searches to replay")
+
+    print(f"Spotify throughput benchmark ({len(cassette)} interactions, {args.workers} workers, {args.calls} calls/method)")
+    print(f"Injected latency {args.latency * 1000:.0f}ms +<= {args.jitter * 1000:.0f}ms, error rate {args.error_rate:.1%}")
+    print("=" * 72)
+    for name, call in benchmarks:
+        result = run(name, call, args.calls, args.workers)
+        print(f"{name:22s} {result['calls_per_second']:8.1f} calls/s | p50 {result['p50_ms']:7.1f} ms | "
+              f"p95 {result['p95_ms']:7.1f} ms | failures {result['failures']}")
+    print("-" * 72)
+    print(f"Transport: {transport.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-track cost of the track representation.
+
+Compares the previous pipeline (11-key dict -> SpotifyTrackData Pydantic
+model -> model_dump at the edge) with the current one (slotted Track ->
+to_dict at the edge) for a 50-track playlist.
+
+Usage:
+    python benchmarks/track_representation.py [--tracks 50] [--rounds 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.track import Track
+
+def make_raw_tracks(count: int) -> List[Dict[str, Any]]:
+    """Raw Spotify track objects shaped like /artists/{id}/top-tracks items"""
+    return [
+        {
+            "id": f"track{i:04d}",
+            "name": f"Song {i}",
+            "artists": [{"name": f"Artist {i % 7}"}, {"name": "Featured Artist"}],
+            "album": {
+                "name": f"Album {i % 5}",
+                "images": [
+                    {"height": 640, "url": f"https://i.scdn.co/image/large{i}"},
+                    {"height": 300, "url": f"https://i.scdn.co/image/medium{i}"},
+                    {"height": 64, "url": f"https://i.scdn.co/image/small{i}"},
+                ],
+            },
+            "duration_ms": 180000 + i * 1000,
+            "popularity": i % 100,
+            "external_urls": {"spotify": f"https://open.spotify.com/track/track{i:04d}"},
+            "preview_url": None,
+        }
+        for i in range(count)
+    ]
+
+# ---- Previous pipeline, kept here only for comparison ----
+
+class LegacySpotifyTrackData(BaseModel):
+    id: str = Field(description="Spotify track ID")
+    name: str = Field(description="Song name")
+    artist: str = Field(description="Artist name(s)")
+    album: str = Field(description="Album name")
+    popularity: int = Field(description="Popularity score (0-100)")
+    duration: str = Field(description="Duration in MM:SS format")
+    spotify_url: str = Field(description="Spotify URL")
+    preview_url: Optional[str] = Field(description="Preview URL if available")
+    album_image_url: Optional[str] = Field(description="Album artwork URL")
+    formatted_summary: str = Field(description="Human-readable summary")
+    error: Optional[str] = None
+
+def legacy_format_track(track: Dict[str, Any]) -> Dict[str, Any]:
+    album_images = track.get('album', {}).get('images', [])
+    album_image_url = None
+    album_image_small = None
+    for image in album_images:
+        if image.get('height') == 640:
+            album_image_url = image.get('url')
+        elif image.get('height') == 64:
+            album_image_small = image.get('url')
+    if not album_image_url and album_images:
+        album_image_url = album_images[0].get('url')
+    if not album_image_small and len(album_images) > 1:
+        album_image_small = album_images[-1].get('url')
+    elif not album_image_small and album_images:
+        album_image_small = album_images[0].get('url')
+    seconds = track['duration_ms'] // 1000
+    return {
+        'id': track['id'],
+        'name': track['name'],
+        'artist': ', '.join([artist['name'] for artist in track['artists']]),
+        'album': track['album']['name'],
+        'duration': f"{seconds // 60}:{seconds % 60:02d}",
+        'popularity': track['popularity'],
+        'spotify_url': track['external_urls']['spotify'],
+        'preview_url': track.get('preview_url'),
+        'album_image_url': album_image_url,
+        'album_image_small': album_image_small
+    }
+
+def legacy_format_track_data(track_dict: Dict[str, Any]) -> LegacySpotifyTrackData:
+    formatted_summary = f"{track_dict['name']} by {track_dict['artist']} | {track_dict['album']} | Popularity: {track_dict['popularity']}/100"
+    return LegacySpotifyTrackData(
+        id=track_dict['id'],
+        name=track_dict['name'],
+        artist=track_dict['artist'],
+        album=track_dict['album'],
+        popularity=track_dict['popularity'],
+        duration=track_dict['duration'],
+        spotify_url=track_dict['spotify_url'],
+        preview_url=track_dict.get('preview_url'),
+        album_image_url=track_dict.get('album_image_url'),
+        formatted_summary=formatted_summary
+    )
+
+# ---- Pipelines under test ----
+
+def legacy_held(raw_tracks):
+    """What the tools kept in memory per playlist"""
+    return [legacy_format_track_data(legacy_format_track(track)) for track in raw_tracks]
+
+def legacy_pipeline(raw_tracks):
+    return [model.model_dump() for model in legacy_held(raw_tracks)]
+
+def track_held(raw_tracks):
+    return [Track.from_spotify(track) for track in raw_tracks]
+
+def track_pipeline(raw_tracks):
+    return [track.to_dict() for track in track_held(raw_tracks)]
+
+def measure_cpu(fn, raw_tracks, rounds: int) -> float:
+    """Microseconds per track"""
+    seconds = min(timeit.repeat(lambda: fn(raw_tracks), number=rounds, repeat=3))
+    return seconds / rounds / len(raw_tracks) * 1e6
+
+def measure_memory(fn, raw_tracks) -> Dict[str, float]:
+    """Bytes per track retained, and peak bytes per track allocated while building"""
+    tracemalloc.start()
+    held = fn(raw_tracks)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return {"retained": retained / len(raw_tracks), "peak": peak / len(raw_tracks)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    raw_tracks = make_raw_tracks(args.tracks)
+    assert legacy_pipeline(raw_tracks)[0]["formatted_summary"] == track_pipeline(raw_tracks)[0]["formatted_summary"]
+
+    print(f"Track representation benchmark ({args.tracks}-track playlist, {args.rounds} rounds)")
+    print("=" * 60)
+    rows = [
+        ("dict -> Pydantic -> model_dump", legacy_held, legacy_pipeline),
+        ("Track -> to_dict", track_held, track_pipeline),
+    ]
+    results = {}
+    for label, held_fn, pipeline_fn in rows:
+        cpu = measure_cpu(pipeline_fn, raw_tracks, args.rounds)
+        memory = measure_memory(held_fn, raw_tracks)
+        results[label] = (cpu, memory)
+        print(f"{label:32s} {cpu:7.2f} us/track | held {memory['retained']:6.0f} B/track | peak {memory['peak']:6.0f} B/track")
+
+    (legacy_cpu, legacy_memory), (track_cpu, track_memory) = results.values()
+    print("-" * 60)
+    print(f"CPU speedup: {legacy_cpu / track_cpu:.1f}x | held memory: {legacy_memory['retained'] / track_memory['retained']:.1f}x smaller")
+
+if __name__ == "__main__":
+    main()
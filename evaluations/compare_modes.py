@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Compare the ReAct and native tool-calling agent modes on the evaluation dataset.
+
+Runs every dataset query through a SpotifyMusicAgent in each mode and
+reports, per mode, LLM round-trips (counted with a callback on every chat
+model call), tool calls, wall-clock latency and the tool_efficiency pass
+rate. Needs the same credentials as the agent; set SPOTIFY_TRANSPORT=replay
+and TAVILY_BACKEND=replay to keep Spotify and web search offline so only
+the LLM differs between runs.
+
+Usage:
+    python evaluations/compare_modes.py [--modes react tool_calling] [--category efficiency_test]
+        [--difficulty easy] [--limit 10] [--async] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.music_agent import SpotifyMusicAgent, AGENT_MODES
+from agent.spotify_tools import close_async_spotify_client
+from dataset import get_evaluation_dataset
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts LLM round-trips made during a run"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls += 1
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.calls += 1
+
+def _measure(case: Dict[str, Any], result: Dict[str, Any], counter: LLMCallCounter, latency: float) -> Dict[str, Any]:
+    """Per-case measurements from an agent result"""
+    max_tool_calls = case["metadata"].get("max_tool_calls", 3)
+    return {
+        "query": case["inputs"]["query"],
+        "category": case["metadata"]["category"],
+        "llm_calls": counter.calls,
+        "tool_calls": result.get("total_tool_calls", 0),
+        "latency": latency,
+        "prompt_tokens": (result.get("prompt_tokens") or {}).get("compact"),
+        "tool_efficiency": 1.0 if result.get("total_tool_calls", 0) <= max_tool_calls else 0.0,
+        "error": bool(result.get("error")),
+    }
+
+def run_case(agent: SpotifyMusicAgent, case: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one dataset case and measure it"""
+    counter = LLMCallCounter()
+    started = time.perf_counter()
+    result = agent.analyze_query(case["inputs"]["query"], callbacks=[counter])
+    return _measure(case, result, counter, time.perf_counter() - started)
+
+async def arun_case(agent: SpotifyMusicAgent, case: Dict[str, Any]) -> Dict[str, Any]:
+    """run_case through aanalyze_query"""
+    counter = LLMCallCounter()
+    started = time.perf_counter()
+    result = await agent.aanalyze_query(case["inputs"]["query"], callbacks=[counter])
+    return _measure(case, result, counter, time.perf_counter() - started)
+
+def _print_run(run: Dict[str, Any]):
+    print(f"  {run['llm_calls']:2d} LLM  {run['tool_calls']:2d} tools  {run['latency']:6.2f}s  {run['query'][:48]}")
+
+def _build_agent(mode: str, cases: List[Dict[str, Any]]) -> SpotifyMusicAgent:
+    print(f"\nMode: {mode} ({len(cases)} cases)")
+    print("=" * 72)
+    agent = SpotifyMusicAgent(mode=mode)
+    agent.agent_executor.verbose = False
+    return agent
+
+def run_modes(modes: List[str], cases: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Run every case in every mode"""
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for mode in modes:
+        agent = _build_agent(mode, cases)
+        results[mode] = []
+        for case in cases:
+            run = run_case(agent, case)
+            results[mode].append(run)
+            _print_run(run)
+    return results
+
+async def arun_modes(modes: List[str], cases: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """run_modes on one event loop, so every case shares one async Spotify client and its connections"""
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        for mode in modes:
+            agent = _build_agent(mode, cases)
+            results[mode] = []
+            for case in cases:
+                run = await arun_case(agent, case)
+                results[mode].append(run)
+                _print_run(run)
+    finally:
+        await close_async_spotify_client()
+    return results
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate the runs of one mode"""
+    latencies = sorted(run["latency"] for run in runs)
+    tokens = [run["prompt_tokens"] for run in runs if run["prompt_tokens"] is not None]
+    return {
+        "cases": len(runs),
+        "llm_calls_mean": statistics.mean(run["llm_calls"] for run in runs),
+        "llm_calls_total": sum(run["llm_calls"] for run in runs),
+        "tool_calls_mean": statistics.mean(run["tool_calls"] for run in runs),
+        "latency_p50": statistics.median(latencies),
+        "latency_p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        "prompt_tokens_mean": statistics.mean(tokens) if tokens else None,
+        "tool_efficiency": statistics.mean(run["tool_efficiency"] for run in runs),
+        "errors": sum(run["error"] for run in runs),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=list(AGENT_MODES), choices=AGENT_MODES)
+    parser.add_argument("--category", help="Only run cases of this category")
+    parser.add_argument("--difficulty", help="Only run cases of this difficulty")
+    parser.add_argument("--limit", type=int, help="Run at most this many cases")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run through aanalyze_query")
+    parser.add_argument("--output", help="Write per-case results and summaries as JSON")
+    args = parser.parse_args()
+
+    cases = [
+        case for case in get_evaluation_dataset()
+        if (args.category is None or case["metadata"]["category"] == args.category)
+        and (args.difficulty is None or case["metadata"]["difficulty"] == args.difficulty)
+    ][:args.limit]
+    if not cases:
+        parser.error("No dataset cases match the filters")
+
+    if args.use_async:
+        results = asyncio.run(arun_modes(args.modes, cases))
+    else:
+        results = run_modes(args.modes, cases)
+
+    summaries = {mode: summarize(runs) for mode, runs in results.items()}
+    print("\nSummary")
+    print("=" * 72)
+    print(f"  {'mode':14s} {'LLM/query':>9s} {'tools/query':>11s} {'p50 s':>7s} {'p95 s':>7s} {'efficiency':>10s} {'errors':>6s}")
+    for mode, summary in summaries.items():
+        print(f"  {mode:14s} {summary['llm_calls_mean']:9.2f} {summary['tool_calls_mean']:11.2f} "
+              f"{summary['latency_p50']:7.2f} {summary['latency_p95']:7.2f} "
+              f"{summary['tool_efficiency']:10.0%} {summary['errors']:6d}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summaries": summaries, "runs": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
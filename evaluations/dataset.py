@@ -619,6 +619,51 @@ def get_evaluation_dataset() -> List[Dict[str, Any]]:
                 "max_tool_calls": 1,
                 "query_type": "genre_minimal"
             }
+        },
+        {
+            "inputs": {"query": "Songs like Drake, SZA and Frank Ocean"},
+            "outputs": {
+                "expected_behavior": "Should resolve all three artists in one batch lookup",
+                "success_criteria": "Songs similar to every artist, one tool call, no per-artist iterations"
+            },
+            "expected_tools": ["batch_music_lookup"],
+
+            "metadata": {
+                "category": "efficiency_test",
+                "difficulty": "medium",
+                "max_tool_calls": 1,
+                "query_type": "multi_artist_batch"
+            }
+        },
+        {
+            "inputs": {"query": "Mix some jazz, soul and neo-soul for me"},
+            "outputs": {
+                "expected_behavior": "Should fetch all three genres in one batch lookup",
+                "success_criteria": "All genres represented, one tool call"
+            },
+            "expected_tools": ["batch_music_lookup"],
+
+            "metadata": {
+                "category": "efficiency_test",
+                "difficulty": "medium",
+                "max_tool_calls": 1,
+                "query_type": "multi_genre_batch"
+            }
+        },
+        {
+            "inputs": {"query": "I'm into Radiohead, Frank Ocean and Björk, find me more like them"},
+            "outputs": {
+                "expected_behavior": "Should look up songs similar to all three artists in one batch lookup",
+                "success_criteria": "Recommendations bridging every artist, explains connections, at most two tool calls"
+            },
+            "expected_tools": ["batch_music_lookup"],
+
+            "metadata": {
+                "category": "complex_query",
+                "difficulty": "hard",
+                "max_tool_calls": 2,
+                "query_type": "taste_analysis_batch"
+            }
         }
     ])
 
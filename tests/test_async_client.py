@@ -0,0 +1,157 @@
+"""AsyncSpotifyClient shares the sync client's token, resilience and catalog layers"""
+import asyncio
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.async_client import AsyncSpotifyClient
+from agent.auth import SpotifyTokenManager
+from agent.catalog import TrackCatalog
+from agent.rate_limit import RequestScheduler
+from agent.resilience import CircuitOpenError, ResilientCaller
+
+def raw_track(i):
+    return {
+        "id": f"t{i}", "name": f"Midnight Song {i}", "artists": [{"name": "Band"}], "album": {"name": "LP", "images": []},
+        "duration_ms": 200000, "popularity": 50, "external_urls": {"spotify": f"u{i}"}, "preview_url": None, "type": "track",
+    }
+
+class FakeSpotify(http.server.BaseHTTPRequestHandler):
+    """/search returns tracks; statuses queued in `script` are answered first"""
+    protocol_version = "HTTP/1.1"
+    script = []
+    gets = []
+
+    def do_GET(self):
+        type(self).gets.append((self.path, self.headers.get("Authorization")))
+        if type(self).script:
+            status = type(self).script.pop(0)
+            return self._send(status, {"error": status})
+        self._send(200, {"tracks": {"items": [raw_track(i) for i in range(5)]}})
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    FakeSpotify.script = []
+    FakeSpotify.gets = []
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeSpotify)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+def make_client(server, **kwargs):
+    tokens = iter(["first", "second", "third"])
+    kwargs.setdefault("token_manager", SpotifyTokenManager(lambda: (next(tokens), 3600)))
+    client = AsyncSpotifyClient("id", "secret", max_retries=0,
+                                scheduler=RequestScheduler(rate=1000, burst=1000), **kwargs)
+    client.base_url = server
+    return client
+
+def test_401_refreshes_the_shared_token_and_retries(server):
+    async def main():
+        client = make_client(server)
+        FakeSpotify.script = [401]
+        try:
+            tracks = await client.search_songs("midnight")
+        finally:
+            await client.aclose()
+        return client, tracks
+
+    client, tracks = asyncio.run(main())
+    assert len(tracks) == 5
+    assert [auth for _, auth in FakeSpotify.gets] == ["Bearer first", "Bearer second"]
+    assert client.get_token_stats()["refreshes"] == 2
+
+def test_server_errors_open_the_shared_breaker(server):
+    resilience = ResilientCaller(failure_threshold=2, reset_timeout=60, hedge=False)
+
+    async def main():
+        client = make_client(server, resilience=resilience)
+        FakeSpotify.script = [500, 500]
+        try:
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    await client.search_songs("midnight")
+            with pytest.raises(Exception, match="Circuit open"):
+                await client.search_songs("midnight")
+        finally:
+            await client.aclose()
+
+    asyncio.run(main())
+    assert len(FakeSpotify.gets) == 2  # The open circuit never reached the server
+    assert resilience.stats()["endpoints"]["/search"]["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        resilience.check("/search")
+
+def test_searches_write_through_to_and_are_answered_from_the_catalog(server):
+    catalog = TrackCatalog(batch_size=1)
+
+    async def main():
+        client = make_client(server, catalog=catalog)
+        try:
+            first = await client.search_songs("midnight", limit=5)
+            second = await client.search_songs("midnight", limit=5)
+        finally:
+            await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert len(FakeSpotify.gets) == 1
+    assert {track.id for track in second} == {track.id for track in first}
+    assert catalog.stats()["local_answers"] == 1
+
+def test_async_hedge_wins_when_the_primary_is_slow():
+    caller = ResilientCaller(hedge_min_samples=1, hedge_min_delay=0.02)
+
+    async def fast():
+        return "warm"
+
+    async def slow():
+        await asyncio.sleep(0.5)
+        return "primary"
+
+    async def hedge():
+        return "hedge"
+
+    async def main():
+        await caller.acall("/search", fast)
+        started = time.monotonic()
+        result = await caller.acall("/search", slow, hedge_fn=hedge)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(main())
+    assert result == "hedge"
+    assert elapsed < 0.4
+    assert caller.stats()["endpoints"]["/search"]["hedge_wins"] == 1
+
+def test_cancelled_trial_call_frees_the_half_open_breaker():
+    caller = ResilientCaller(failure_threshold=1, reset_timeout=0.01, hedge=False)
+    breaker = caller._endpoint_state("/search")[0]
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    async def main():
+        task = asyncio.ensure_future(caller.acall("/search", lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.allow()  # A new trial is allowed
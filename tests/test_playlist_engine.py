@@ -0,0 +1,37 @@
+"""rank_playlist reproducibility"""
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.playlist_engine import rank_playlist
+from agent.track import Track
+
+def make_tracks(count):
+    return [
+        Track(f"t{i:03d}", f"Song {i}", (f"Artist {i % 7}",), "Album", 200000, 40 + i % 50, f"u{i}")
+        for i in range(count)
+    ]
+
+def test_same_seed_same_playlist_whatever_the_candidate_order():
+    tracks = make_tracks(60)
+    expected = [track.id for track in rank_playlist(tracks, 10, seed=42)]
+    for shuffle_seed in range(5):
+        shuffled = tracks[:]
+        random.Random(shuffle_seed).shuffle(shuffled)
+        assert [track.id for track in rank_playlist(shuffled, 10, seed=42)] == expected
+
+def test_affinity_follows_its_track_when_reordered():
+    tracks = make_tracks(20)
+    affinity = [1.0 if i < 5 else 0.0 for i in range(20)]
+    expected = [track.id for track in rank_playlist(tracks, 5, affinity=affinity, seed=1)]
+    pairs = list(zip(tracks, affinity))[::-1]
+    reordered = rank_playlist([t for t, _ in pairs], 5, affinity=[a for _, a in pairs], seed=1)
+    assert [track.id for track in reordered] == expected
+
+def test_respects_size_and_artist_cap():
+    playlist = rank_playlist(make_tracks(60), 14, max_per_artist=2, seed=3)
+    assert len(playlist) == 14
+    artists = [track.primary_artist for track in playlist]
+    assert max(artists.count(artist) for artist in set(artists)) <= 2
@@ -0,0 +1,144 @@
+"""AgentPool checkout, release, timeout and cancellation behavior"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.pool import AgentPool
+
+def test_agents_are_reused_and_built_up_to_size():
+    pool = AgentPool(size=2, factory=object)
+    with pool.agent() as first:
+        pass
+    with pool.agent() as second:
+        assert second is first
+    with pool.agent() as a, pool.agent() as b:
+        assert a is not b
+    stats = pool.stats()
+    assert stats["built"] == 2
+    assert stats["idle"] == 2
+    assert stats["checkouts"] == 4
+
+def test_warm_up_builds_the_whole_pool_once():
+    pool = AgentPool(size=3, factory=object)
+    pool.warm_up()
+    pool.warm_up()
+    assert pool.stats()["built"] == 3
+    assert pool.stats()["idle"] == 3
+
+def test_failed_build_gives_the_slot_back():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return object()
+
+    pool = AgentPool(size=1, factory=factory)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    with pool.agent():
+        pass
+    assert pool.stats()["built"] == 1
+
+def test_acquire_times_out_when_every_agent_is_busy():
+    pool = AgentPool(size=1, factory=object, timeout=0.05)
+    with pool.agent():
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+    with pool.agent():
+        pass
+
+def test_waiter_gets_the_released_agent():
+    pool = AgentPool(size=1, factory=object, timeout=2)
+    held = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+    assert pool.acquire() is held
+    assert pool.stats()["waits"] == 1
+
+def test_concurrent_checkouts_never_share_an_agent():
+    pool = AgentPool(size=3, factory=object, timeout=5)
+    in_use = set()
+    lock = threading.Lock()
+    errors = []
+
+    def work():
+        for _ in range(50):
+            with pool.agent() as agent:
+                with lock:
+                    if id(agent) in in_use:
+                        errors.append(agent)
+                    in_use.add(id(agent))
+                time.sleep(0.0005)
+                with lock:
+                    in_use.discard(id(agent))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert pool.stats()["built"] == 3
+    assert pool.stats()["idle"] == 3
+
+def test_async_checkout_waits_without_blocking_the_loop():
+    pool = AgentPool(size=1, factory=object, timeout=2)
+
+    async def main():
+        ticks = 0
+
+        async def hold():
+            async with pool.aagent():
+                await asyncio.sleep(0.1)
+
+        async def tick():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        async def wait():
+            await asyncio.sleep(0.01)
+            async with pool.aagent():
+                pass
+
+        await asyncio.gather(hold(), tick(), wait())
+        return ticks
+
+    assert asyncio.run(main()) == 5
+    assert pool.stats()["idle"] == 1
+
+def test_cancelled_async_waiter_does_not_strand_the_agent():
+    pool = AgentPool(size=1, factory=object, timeout=2)
+
+    async def main():
+        held = pool.acquire()
+
+        async def wait():
+            async with pool.aagent():
+                pass
+
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        pool.release(held)
+        # The abandoned checkout completes in its thread and hands the agent back
+        for _ in range(100):
+            stats = pool.stats()
+            if stats["checkouts"] == 2 and stats["idle"] == 1:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert pool.stats()["idle"] == 1
+    with pool.agent(timeout=0.1):
+        pass
@@ -0,0 +1,73 @@
+"""429 handling: rate limits must reach the shared RequestScheduler"""
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.auth import SpotifyTokenManager
+from agent.cache import ArtistIdCache
+from agent.client import WorkingSpotifyClient
+from agent.rate_limit import RequestScheduler
+
+class RateLimitedHandler(http.server.BaseHTTPRequestHandler):
+    """Answers 429 with Retry-After to the first `limited` GETs, then 200"""
+    protocol_version = "HTTP/1.1"
+    limited = 1
+    gets = 0
+
+    def do_GET(self):
+        type(self).gets += 1
+        if type(self).gets <= type(self).limited:
+            self._send(429, {"error": "rate limited"}, {"Retry-After": "1"})
+        else:
+            self._send(200, {"ok": True})
+
+    def _send(self, code, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    RateLimitedHandler.gets = 0
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RateLimitedHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+def test_429_pauses_the_shared_scheduler(server):
+    scheduler = RequestScheduler(rate=100, burst=10, max_retries=3)
+    client = WorkingSpotifyClient("id", "secret", scheduler=scheduler, artist_cache=ArtistIdCache())
+    client.token_manager = SpotifyTokenManager(lambda: ("token", 3600))
+    client.base_url = server
+
+    started = time.monotonic()
+    assert client._make_request("/ping", cache=False) == {"ok": True}
+    elapsed = time.monotonic() - started
+
+    metrics = scheduler.metrics()
+    assert RateLimitedHandler.gets == 2  # urllib3 did not retry the 429 on its own
+    assert metrics["rate_limited_responses"] == 1
+    assert metrics["retry_after_seconds"] == 1.0
+    assert elapsed >= 1.0
+
+def test_429_blocks_other_callers_for_retry_after():
+    scheduler = RequestScheduler(rate=100, burst=10)
+    scheduler.on_rate_limited(0.2)
+    assert scheduler.metrics()["paused_for"] > 0
+    started = time.monotonic()
+    scheduler.acquire()
+    assert time.monotonic() - started >= 0.15
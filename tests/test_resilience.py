@@ -0,0 +1,86 @@
+"""Circuit breaker state changes, hedging, and breaker checks ahead of rate limiting"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.client import WorkingSpotifyClient
+from agent.rate_limit import RequestScheduler
+from agent.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, ResilientCaller
+)
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()  # The single trial call
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    assert breaker.stats()["times_opened"] == 1
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+def test_precheck_does_not_claim_the_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.precheck()
+    time.sleep(0.06)
+    assert breaker.precheck()
+    assert breaker.allow()
+    assert not breaker.precheck()
+
+def test_caller_rejects_while_open():
+    caller = ResilientCaller(failure_threshold=1, reset_timeout=60, hedge=False)
+    with pytest.raises(ValueError):
+        caller.call("/artists/a1/top-tracks", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    # Resource IDs share one breaker per endpoint template
+    with pytest.raises(CircuitOpenError):
+        caller.call("/artists/a2/top-tracks", lambda: "ok")
+    with pytest.raises(CircuitOpenError):
+        caller.check("/artists/a3/top-tracks")
+    assert caller.call("/search", lambda: "ok") == "ok"
+
+def test_hedge_wins_when_the_primary_is_slow():
+    caller = ResilientCaller(hedge_min_samples=1, hedge_min_delay=0.02, max_workers=4)
+    caller.call("/search", lambda: "warm")  # One fast sample sets the hedge delay
+
+    def slow():
+        time.sleep(0.5)
+        return "primary"
+
+    started = time.monotonic()
+    assert caller.call("/search", slow, hedge_fn=lambda: "hedge") == "hedge"
+    assert time.monotonic() - started < 0.4
+    stats = caller.stats()["endpoints"]["/search"]
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+    caller.close()
+
+def test_open_circuit_does_not_spend_rate_limit_tokens():
+    scheduler = RequestScheduler(rate=100, burst=10)
+    resilience = ResilientCaller(failure_threshold=1, reset_timeout=60, hedge=False)
+    client = WorkingSpotifyClient("id", "secret", scheduler=scheduler, resilience=resilience)
+    resilience._endpoint_state("/search")[0].record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        client._send_scheduled("/search", "http://127.0.0.1:9/search", {}, None)
+    assert sum(scheduler.metrics()["requests"].values()) == 0